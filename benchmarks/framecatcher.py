@@ -0,0 +1,56 @@
+"""Measure the CPU usage and latency of ffmpeg FrameCatcher threads.
+
+The threads read from synthetic 640x480 camera streams, so neither ffmpeg nor
+a camera is needed. Usage::
+
+    python benchmarks/framecatcher.py [n_streams] [fps] [duration]
+
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from imageio.plugins.ffmpeg import FrameCatcher
+
+
+def benchmark_framecatcher(n_streams=8, fps=30, duration=5.0):
+    frame = bytes(640 * 480 * 3)
+
+    def fake_camera():
+        t = time.perf_counter()
+        while True:
+            t += 1 / fps
+            time.sleep(max(0, t - time.perf_counter()))
+            yield time.perf_counter(), frame
+
+    catchers = [FrameCatcher(fake_camera()) for _ in range(n_streams)]
+    latencies = []
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    while time.perf_counter() - t0 < duration:
+        for T in catchers:
+            (timestamp, _), _ = T.get_frame(wait_for_new=True)
+            latencies.append(time.perf_counter() - timestamp)
+    etime, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    for T in catchers:
+        T.stop_me()
+
+    return 100 * cpu / etime, 1000 * np.mean(latencies)
+
+
+if __name__ == "__main__":
+    n_streams, fps, duration = 8, 30, 5.0
+    args = sys.argv[1:]
+    if len(args) > 0:
+        n_streams = int(args[0])
+    if len(args) > 1:
+        fps = int(args[1])
+    if len(args) > 2:
+        duration = float(args[2])
+
+    cpu, latency = benchmark_framecatcher(n_streams, fps, duration)
+    print(
+        "%i streams at %i fps: %.1f%% cpu, mean latency %.3f ms"
+        % (n_streams, fps, cpu, latency)
+    )
@@ -40,7 +40,35 @@ def _precision_warn(p1, p2, extra=""):
     logger.warning(t.format(p1, p2, extra, p2))
 
 
-def image_as_uint(im, bitdepth=None):
+# The number of elements that image_as_uint processes at a time. Small enough
+# for a chunk (and its temporaries) to stay in the CPU cache.
+_CHUNK_SIZE = 2**18
+
+
+def _iter_chunks(im):
+    """Yield slices that split an array of at least 1D into chunks of about
+    _CHUNK_SIZE elements along its first axis."""
+    n = im.shape[0]
+    step = max(1, _CHUNK_SIZE * n // max(im.size, 1))
+    for i in range(0, n, step):
+        yield slice(i, i + step)
+
+
+def _nan_min_max(im):
+    """Get the minimum and maximum of an array of at least 1D, ignoring NaN.
+    Both are computed per chunk, so the array is only read once."""
+    mi = ma = None
+    for sl in _iter_chunks(im):
+        chunk = im[sl]
+        lo, hi = chunk.min(), chunk.max()
+        if lo != lo or hi != hi:  # chunk contains NaN
+            lo, hi = np.nanmin(chunk), np.nanmax(chunk)
+        mi = lo if mi is None else np.fmin(mi, lo)
+        ma = hi if ma is None else np.fmax(ma, hi)
+    return mi, ma
+
+
+def image_as_uint(im, bitdepth=None, out=None):
     """Convert the given image to uint (default: uint8)
 
     If the dtype already matches the desired format, it is returned
@@ -49,6 +77,10 @@ def image_as_uint(im, bitdepth=None):
     situations, the values are scaled such that the minimum value
     becomes 0 and the maximum value becomes np.power(2.0, bitdepth)-1
     (255 for 8-bit and 65535 for 16-bit).
+
+    The image is converted in chunks, so that little extra memory is
+    needed. If ``out`` is given, the result is written into it; it must
+    have the same shape as the image and the uint dtype to convert to.
     """
     if not bitdepth:
         bitdepth = 8
@@ -62,48 +94,78 @@ def image_as_uint(im, bitdepth=None):
         raise ValueError("Bitdepth must be either 8 or 16")
     dtype_str1 = str(im.dtype)
     dtype_str2 = out_type.__name__
+    if out is None:
+        pass
+    elif out.shape != im.shape or out.dtype != out_type:
+        raise ValueError(
+            "out must have shape {} and dtype {}".format(im.shape, dtype_str2)
+        )
     if (im.dtype == np.uint8 and bitdepth == 8) or (
         im.dtype == np.uint16 and bitdepth == 16
     ):
         # Already the correct format? Return as-is
-        return im
-    if dtype_str1.startswith("float") and np.nanmin(im) >= 0 and np.nanmax(im) <= 1:
-        _precision_warn(dtype_str1, dtype_str2, "Range [0, 1].")
-        im = im.astype(np.float64) * (np.power(2.0, bitdepth) - 1) + 0.499999999
-    elif im.dtype == np.uint16 and bitdepth == 8:
+        if out is None:
+            return im
+        np.copyto(out, im)
+        return out
+
+    if out is None:
+        out = np.empty(im.shape, out_type)
+    if im.size == 0:
+        return out
+    # Chunks are taken along the first axis, so we need at least one
+    im_nd, out_nd = (im, out) if im.ndim else (im[np.newaxis], out[np.newaxis])
+
+    # Unsigned ints lose their least significant bits
+    shift = None
+    if im.dtype == np.uint16 and bitdepth == 8:
         _precision_warn(dtype_str1, dtype_str2, "Losing 8 bits of resolution.")
-        im = np.right_shift(im, 8)
-    elif im.dtype == np.uint32:
+        shift = 8
+    elif im.dtype == np.uint32 or im.dtype == np.uint64:
+        shift = im.dtype.itemsize * 8 - bitdepth
         _precision_warn(
             dtype_str1,
             dtype_str2,
-            "Losing {} bits of resolution.".format(32 - bitdepth),
+            "Losing {} bits of resolution.".format(shift),
         )
-        im = np.right_shift(im, 32 - bitdepth)
-    elif im.dtype == np.uint64:
-        _precision_warn(
-            dtype_str1,
-            dtype_str2,
-            "Losing {} bits of resolution.".format(64 - bitdepth),
-        )
-        im = np.right_shift(im, 64 - bitdepth)
+    if shift is not None:
+        for sl in _iter_chunks(im_nd):
+            np.right_shift(im_nd[sl], shift, out=out_nd[sl], casting="unsafe")
+        return out
+
+    # Everything else is scaled
+    mi, ma = _nan_min_max(im_nd)
+    max_value = np.power(2.0, bitdepth) - 1
+    if dtype_str1.startswith("float") and mi >= 0 and ma <= 1:
+        _precision_warn(dtype_str1, dtype_str2, "Range [0, 1].")
+        offset, scale = 0.0, max_value
     else:
-        mi = np.nanmin(im)
-        ma = np.nanmax(im)
         if not np.isfinite(mi):
             raise ValueError("Minimum image value is not finite")
         if not np.isfinite(ma):
             raise ValueError("Maximum image value is not finite")
         if ma == mi:
-            return im.astype(out_type)
+            np.copyto(out, im, casting="unsafe")
+            return out
         _precision_warn(dtype_str1, dtype_str2, "Range [{}, {}].".format(mi, ma))
-        # Now make float copy before we scale
-        im = im.astype("float64")
-        # Scale the values between 0 and 1 then multiply by the max value
-        im = (im - mi) / (ma - mi) * (np.power(2.0, bitdepth) - 1) + 0.499999999
-    assert np.nanmin(im) >= 0
-    assert np.nanmax(im) < np.power(2.0, bitdepth)
-    return im.astype(out_type)
+        offset, scale = float(mi), max_value / (float(ma) - float(mi))
+
+    # float32 suffices for 8-bit output, unless the values themselves need
+    # more precision (i.e. large ints or float64)
+    if bitdepth == 8 and np.can_cast(im.dtype, np.float32):
+        work_type = np.float32
+    else:
+        work_type = np.float64
+
+    # Scale the values between 0 and the max value, and round half down
+    for sl in _iter_chunks(im_nd):
+        chunk = im_nd[sl].astype(work_type)
+        chunk -= offset
+        chunk *= scale
+        chunk -= 0.5
+        np.ceil(chunk, out=chunk)
+        out_nd[sl] = chunk
+    return out
 
 
 class Array(np.ndarray):
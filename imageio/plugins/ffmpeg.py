@@ -60,6 +60,20 @@ output_params : list
     stream being read by imageio).
 print_info : bool
     Print information about the video file as reported by ffmpeg.
+buffers : int | None
+    The number of preallocated frame buffers to cycle through. By default
+    (None) each frame is read into a newly allocated array. If set, frames
+    are read into a ring of this many reusable buffers and the returned
+    arrays are views into that ring, i.e. a frame is overwritten once
+    ``buffers`` more frames have been read. This avoids a memory allocation
+    per frame and is meant for consumers that process each frame right away.
+prefetch : int
+    The number of frames to read ahead in a background thread. Default 0,
+    i.e. frames are read when requested. When set, ffmpeg keeps decoding
+    while your code processes the current frame. Only used when reading
+    files; ``get_data`` still returns the same frames as without prefetching.
+    When combined with ``buffers``, ``buffers`` must be at least
+    ``prefetch + 2``.
 
 Parameters for writing
 ----------------------
@@ -114,9 +128,19 @@ audio_path : str | None
 audio_codec : str | None
     The audio codec to use. Defaults to nothing, but if an audio_path has
     been provided ffmpeg will attempt to set a default codec.
+queue_size : int
+    The number of frames to buffer for a background thread that sends them
+    to ffmpeg. Default 0, i.e. ``append_data`` blocks until ffmpeg has
+    accepted the frame. When set, the next frame can be produced while
+    ffmpeg is encoding. Frames are copied if they would otherwise share
+    memory with the given array. Errors that occur while writing are raised
+    by a later call to ``append_data`` or on close.
 
 Notes
 -----
+The writer's ``append_data`` also accepts a batch of frames as an array of
+shape (N, H, W, C), which is sent to ffmpeg in a single write.
+
 If you are using anaconda and ``anaconda/ffmpeg`` you will not be able to
 encode/decode H.264 (likely due to licensing concerns). If you need this
 format on anaconda install ``conda-forge/ffmpeg`` instead.
@@ -127,21 +151,34 @@ specific ffmpeg executable.
 To get the number of frames before having read them all, you can use the
 ``reader.count_frames()`` method (the reader will then use
 ``imageio_ffmpeg.count_frames_and_secs()`` to get the exact number of frames,
-note that this operation can take a few seconds on large files). Alternatively,
+note that this operation can take a few seconds on large files, so the result
+is cached per file). Alternatively,
 the number of frames can be estimated from the fps and duration in the meta data
 (though these values themselves are not always present/reliable).
 
 """
 
+import os
 import re
 import sys
 import time
+import bisect
 import logging
 import platform
+import collections
 import threading
+import queue
 import subprocess as sp
 import imageio_ffmpeg
 
+try:
+    # imageio-ffmpeg's helpers to start ffmpeg, catch its log and parse the
+    # header, so that FramePipe starts ffmpeg the same way read_frames does
+    from imageio_ffmpeg._parsing import LogCatcher, parse_ffmpeg_header
+    from imageio_ffmpeg._utils import _popen_kwargs
+except ImportError:  # pragma: no cover
+    LogCatcher = None
+
 import numpy as np
 
 from ..core import Format, image_as_uint
@@ -159,6 +196,65 @@ else:  # pragma: no cover
     CAM_FORMAT = "unknown-cam-format"
 
 
+# Seeks are done by fast-seeking to this many seconds before the target, and
+# decoding the rest of the way (see Reader._initialize).
+_SEEK_SLOW_SECONDS = 10
+
+# Probe results that are expensive to obtain (frame counts, keyframe times),
+# keyed by the filename, size and modification time of the video.
+_PROBE_CACHE = {}
+_PROBE_CACHE_SIZE = 64
+
+
+def _get_probe_cache(filename):
+    """Get the dict in which to cache probe results for the given file. Is not
+    stored for non-files, such as cameras."""
+    try:
+        stat = os.stat(filename)
+    except (OSError, ValueError):
+        return {}
+    key = (filename, stat.st_size, stat.st_mtime_ns)
+    if key not in _PROBE_CACHE:
+        while len(_PROBE_CACHE) >= _PROBE_CACHE_SIZE:
+            del _PROBE_CACHE[next(iter(_PROBE_CACHE))]
+        _PROBE_CACHE[key] = {}
+    return _PROBE_CACHE[key]
+
+
+def _scan_keyframe_times(filename):
+    """Get the sorted times (in seconds, relative to the first packet) of the
+    keyframes in the first video stream of a file. The packets are only
+    demuxed, not decoded, so this is fast. Returns None on failure.
+    """
+    cmd = [imageio_ffmpeg.get_ffmpeg_exe(), "-v", "error", "-i", filename]
+    cmd += ["-map", "0:v:0", "-c", "copy", "-f", "framecrc", "-"]
+    completed_process = sp.run(cmd, stdout=sp.PIPE, stderr=sp.DEVNULL, check=False)
+    if completed_process.returncode != 0:
+        return None
+
+    time_base = None
+    times, keyframe_times = [], []
+    for line in completed_process.stdout.decode("utf-8", "ignore").splitlines():
+        if line.startswith("#tb 0:"):
+            num, den = line.split(":")[1].split("/")
+            time_base = int(num) / int(den)
+        elif line and not line.startswith("#") and time_base is not None:
+            # stream, dts, pts, duration, size, hash[, F=flags]
+            parts = [part.strip() for part in line.split(",")]
+            try:
+                pts = int(parts[2]) * time_base
+                flags = int(parts[6][2:], 16) if len(parts) > 6 else 1
+            except (IndexError, ValueError):  # pragma: no cover
+                continue
+            times.append(pts)
+            if flags & 1:
+                keyframe_times.append(pts)
+
+    if not keyframe_times:
+        return None
+    return sorted(t - min(times) for t in keyframe_times)
+
+
 def download(directory=None, force_download=False):  # pragma: no cover
     raise RuntimeError(
         "imageio.ffmpeg.download() has been deprecated. "
@@ -203,6 +299,7 @@ class FfmpegFormat(Format):
 
     class Reader(Format.Reader):
         _frame_catcher = None
+        _prefetcher = None
         _read_gen = None
 
         def _get_cam_inputname(self, index):
@@ -263,6 +360,8 @@ class FfmpegFormat(Format):
             input_params=None,
             output_params=None,
             fps=None,
+            buffers=None,
+            prefetch=0,
         ):
             # Get generator functions
             self._ffmpeg_api = imageio_ffmpeg
@@ -289,6 +388,18 @@ class FfmpegFormat(Format):
                     raise ValueError(
                         "dtype must be one of: {}".format(", ".join(allowed_dtypes))
                     )
+            if buffers is None:
+                self._buffers = None
+            elif int(buffers) >= 1:
+                self._buffers = [None] * int(buffers)
+            else:
+                raise ValueError("FFMPEG buffers must be a positive int")
+            self._buffer_index = -1
+            self._arg_prefetch = int(prefetch or 0)
+            if self._arg_prefetch < 0:
+                raise ValueError("FFMPEG prefetch must be a non-negative int")
+            if self._buffers and len(self._buffers) < self._arg_prefetch + 2:
+                raise ValueError("FFMPEG buffers must be at least prefetch + 2")
             self._arg_pixelformat = pixelformat
             self._arg_input_params = input_params or []
             self._arg_output_params = output_params or []
@@ -319,6 +430,8 @@ class FfmpegFormat(Format):
             self._pos = -1
             self._meta = {"plugin": "ffmpeg"}
             self._lastread = None
+            self._pipe = None
+            self._skip_buffer = None
 
             # Calculating this from fps and duration is not accurate,
             # and calculating it exactly with ffmpeg_api.count_frames_and_secs
@@ -345,6 +458,7 @@ class FfmpegFormat(Format):
                 self._arg_output_params.extend(["-r", str(float(30))])
 
             # Start ffmpeg subprocess and get meta information
+            t0 = time.perf_counter()
             try:
                 self._initialize()
             except IndexError:
@@ -354,6 +468,9 @@ class FfmpegFormat(Format):
                     self._initialize()
                 else:
                     raise
+            # Used to decide between seeking and reading forward
+            self._startup_time = time.perf_counter() - t0
+            self._frame_time = None
 
             # For cameras, create thread that keeps reading the images
             if self.request._video:
@@ -371,10 +488,20 @@ class FfmpegFormat(Format):
             # if the frame catcher thread is using it
             if self._frame_catcher is not None:
                 self._frame_catcher.stop_me()
+                if self._frame_catcher.is_alive():  # pragma: no cover
+                    # Still waiting for ffmpeg; the generator can only be
+                    # closed from the thread that is using it
+                    self._read_gen = None
                 self._frame_catcher = None
+            if self._prefetcher is not None:
+                self._prefetcher.stop_me()
+                self._prefetcher = None
             if self._read_gen is not None:
                 self._read_gen.close()
                 self._read_gen = None
+            if self._pipe is not None:
+                self._pipe.close()
+                self._pipe = None
 
         def count_frames(self):
             """Count the number of frames. Note that this can take a few
@@ -387,8 +514,11 @@ class FfmpegFormat(Format):
             # if self.request.kwargs.get("fps", None):
             #     fps = float(self.request.kwargs["fps"])
             #     oargs += ["-r", "%.02f" % fps]
-            cf = self._ffmpeg_api.count_frames_and_secs
-            return cf(self._filename)[0]
+            cache = _get_probe_cache(self._filename)
+            if "nframes" not in cache:
+                cf = self._ffmpeg_api.count_frames_and_secs
+                cache["nframes"] = cf(self._filename)[0]
+            return cache["nframes"]
 
         def _get_length(self):
             return self._nframes  # only not inf if loop is True
@@ -409,22 +539,89 @@ class FfmpegFormat(Format):
                 raise IndexError("Frame index must be >= 0")
             elif index >= self._nframes:
                 raise IndexError("Reached end of video")
+            elif index < self._pos or self._seek_is_faster(index):
+                t0 = time.perf_counter()
+                self._initialize(index)
+                result, is_new = self._read_frame()
+                self._update_seek_model(index, time.perf_counter() - t0)
             else:
-                if (index < self._pos) or (index > self._pos + 100):
-                    self._initialize(index)
-                else:
-                    self._skip_frames(index - self._pos - 1)
+                t0 = time.perf_counter()
+                n_skip = index - self._pos - 1
+                self._skip_frames(n_skip)
                 result, is_new = self._read_frame()
-                self._pos = index
-                return result, dict(new=is_new)
+                self._update_frame_time((time.perf_counter() - t0) / (n_skip + 1))
+            self._pos = index
+            return result, dict(new=is_new)
+
+        def _seek_is_faster(self, index):
+            """Estimate whether restarting ffmpeg at the given index is
+            faster than reading forward to it. A restart costs the startup
+            time of ffmpeg plus decoding from the keyframe that the fast seek
+            lands on, while reading forward costs decoding all frames in
+            between. Both are timed as we go.
+            """
+            if self.request._video or self._frame_time is None:
+                return index > self._pos + 100
+            forward_time = (index - self._pos - 1) * self._frame_time
+            if forward_time <= self._startup_time:
+                return False  # no need to scan for keyframes
+            seek_time = self._startup_time + self._seek_frames(index) * self._frame_time
+            return seek_time < forward_time
+
+        def _seek_frames(self, index, scan=True):
+            """Estimate how many frames ffmpeg decodes when seeking to the
+            given index. If ``scan`` is False and the keyframe times are not
+            known yet, assume that there is a keyframe where the fast seek
+            lands instead of scanning the file for them."""
+            fps = self._meta.get("fps", 0)
+            if not fps:
+                return index
+            starttime = index / fps
+            seek_fast = starttime - min(_SEEK_SLOW_SECONDS, starttime)
+
+            cache = _get_probe_cache(self._filename)
+            if "keyframe_times" not in cache:
+                if not scan:
+                    return (starttime - seek_fast) * fps
+                cache["keyframe_times"] = _scan_keyframe_times(self._filename)
+            keyframe_times = cache["keyframe_times"]
+            if keyframe_times:
+                i = bisect.bisect_right(keyframe_times, seek_fast)
+                seek_fast = keyframe_times[max(i - 1, 0)]
+
+            return (starttime - seek_fast) * fps
+
+        def _update_frame_time(self, frame_time):
+            if self._frame_time is None:
+                self._frame_time = frame_time
+            else:
+                self._frame_time = 0.8 * self._frame_time + 0.2 * frame_time
+
+        def _update_seek_model(self, index, etime):
+            if self._frame_time is None or self.request._video:
+                return
+            # backward seeks restart ffmpeg regardless, so they shouldn't
+            # trigger a scan of the whole file for keyframes
+            n_frames = self._seek_frames(index, scan=False)
+            startup_time = etime - (n_frames + 1) * self._frame_time
+            self._startup_time = 0.8 * self._startup_time + 0.2 * max(0, startup_time)
 
         def _get_meta_data(self, index):
             return self._meta
 
         def _initialize(self, index=0):
-            # Close the current generator, and thereby terminate its subprocess
+            # Stop reading ahead from the current subprocess
+            if self._prefetcher is not None:
+                self._prefetcher.stop_me()
+                self._prefetcher = None
+
+            # Close the current generator or pipe, and thereby terminate ffmpeg
             if self._read_gen is not None:
                 self._read_gen.close()
+                self._read_gen = None
+            if self._pipe is not None:
+                self._pipe.close()
+                self._pipe = None
 
             iargs = []
             oargs = []
@@ -449,7 +646,7 @@ class FfmpegFormat(Format):
                 # by combining slow and fast. Seek the long stretch using
                 # the fast method, and seek the last 10s the slow way.
                 starttime = index / self._meta["fps"]
-                seek_slow = min(10, starttime)
+                seek_slow = min(_SEEK_SLOW_SECONDS, starttime)
                 seek_fast = starttime - seek_slow
                 # We used to have this epsilon earlier, when we did not use
                 # the slow seek. I don't think we need it anymore.
@@ -469,11 +666,23 @@ class FfmpegFormat(Format):
             pix_fmt = self._pix_fmt
             bpp = self._depth * self._bytes_per_channel
 
-            # Create generator
-            rf = self._ffmpeg_api.read_frames
-            self._read_gen = rf(
-                self._filename, pix_fmt, bpp, input_params=iargs, output_params=oargs
-            )
+            if self.request._video or LogCatcher is None:
+                # Create generator, which starts ffmpeg when it is first used.
+                self._read_gen = self._ffmpeg_api.read_frames(
+                    self._filename,
+                    pix_fmt,
+                    bpp,
+                    input_params=iargs,
+                    output_params=oargs,
+                )
+            else:
+                # Frames are read from our own subprocess, so that they can
+                # be read directly into numpy arrays.
+                cmd = [self._ffmpeg_api.get_ffmpeg_exe(), "-nostats"]
+                cmd += iargs + ["-i", self._filename]
+                cmd += ["-pix_fmt", pix_fmt, "-vcodec", "rawvideo", "-f", "image2pipe"]
+                cmd += oargs + ["-"]
+                self._pipe = FramePipe(cmd)
 
             # Read meta data. This start the generator (and ffmpeg subprocess)
             if self.request._video:
@@ -496,49 +705,103 @@ class FfmpegFormat(Format):
                     )
                 else:
                     self._meta.update(meta)
+            elif self._pipe is None:
+                meta = self._read_gen.__next__()
+                if index == 0:
+                    self._meta.update(meta)
             elif index == 0:
-                self._meta.update(self._read_gen.__next__())
-            else:
-                self._read_gen.__next__()  # we already have meta data
+                self._meta.update(self._pipe.meta)
+
+            # For files, optionally start a thread that reads ahead
+            if self._arg_prefetch and not self.request._video:
+                self._prefetcher = FramePrefetcher(
+                    self._read_next_frame, self._arg_prefetch
+                )
+
+        def _get_buffer(self, shape):
+            """Get the array to read the next frame into."""
+            if self._buffers is None:
+                return np.empty(shape, self._dtype)
+            self._buffer_index = (self._buffer_index + 1) % len(self._buffers)
+            buffer = self._buffers[self._buffer_index]
+            if buffer is None or buffer.shape != shape:
+                buffer = np.empty(shape, self._dtype)
+                self._buffers[self._buffer_index] = buffer
+            return buffer
 
         def _skip_frames(self, n=1):
             """Reads and throws away n frames"""
-            for i in range(n):
-                self._read_gen.__next__()
+            if self._prefetcher is not None:
+                for i in range(n):
+                    self._prefetcher.get_frame()
+            elif self._pipe is None:
+                for i in range(n):
+                    self._read_gen.__next__()
+            elif n > 0:
+                w, h = self._meta["size"]
+                framesize = w * h * self._depth * self._bytes_per_channel
+                if self._skip_buffer is None or len(self._skip_buffer) != framesize:
+                    self._skip_buffer = bytearray(framesize)
+                for i in range(n):
+                    nbytes = self._pipe.readinto(self._skip_buffer)
+                    if nbytes == 0:
+                        raise StopIteration()
+                    elif nbytes != framesize:
+                        raise self._pipe.frame_error(nbytes, framesize)
             self._pos += n
 
         def _read_frame(self):
-            # Read and convert to numpy array
+            if self._prefetcher is not None:
+                result, is_new = self._prefetcher.get_frame()
+            else:
+                result, is_new = self._read_next_frame()
+
+            # Store and return
+            self._lastread = result
+            return result, is_new
+
+        def _read_next_frame(self):
+            # Read into a numpy array
             w, h = self._meta["size"]
             framesize = w * h * self._depth * self._bytes_per_channel
             # t0 = time.time()
 
-            # Read frame
-            if self._frame_catcher:  # pragma: no cover - camera thing
-                s, is_new = self._frame_catcher.get_frame()
-            else:
-                s = self._read_gen.__next__()
+            # Read frame. Where we can, ffmpeg's output is read directly into
+            # the array, so that it is neither copied nor allocated twice.
+            if self._pipe is not None:
+                result = self._get_buffer((h, w, self._depth))
+                nbytes = self._pipe.readinto(result)
+                if nbytes == 0:
+                    raise StopIteration()
+                elif nbytes != framesize:
+                    raise self._pipe.frame_error(nbytes, framesize)
                 is_new = True
+            else:
+                if self._frame_catcher:  # pragma: no cover - camera thing
+                    s, is_new = self._frame_catcher.get_frame()
+                else:
+                    s = self._read_gen.__next__()
+                    is_new = True
+                nbytes = len(s)
+                if nbytes == framesize:
+                    result = self._get_buffer((h, w, self._depth))
+                    result.reshape(-1)[:] = np.frombuffer(s, dtype=self._dtype)
 
             # Check
-            if len(s) != framesize:
+            if nbytes != framesize:
                 raise RuntimeError(
-                    "Frame is %i bytes, but expected %i." % (len(s), framesize)
+                    "Frame is %i bytes, but expected %i." % (nbytes, framesize)
                 )
-
-            result = np.frombuffer(s, dtype=self._dtype).copy()
-            result = result.reshape((h, w, self._depth))
             # t1 = time.time()
             # print('etime', t1-t0)
 
-            # Store and return
-            self._lastread = result
             return result, is_new
 
     # --
 
     class Writer(Format.Writer):
         _write_gen = None
+        _frame_writer = None
 
         def _open(
             self,
@@ -554,26 +817,45 @@ class FfmpegFormat(Format):
             macro_block_size=16,
             audio_path=None,
             audio_codec=None,
+            queue_size=0,
         ):
             self._ffmpeg_api = imageio_ffmpeg
             self._filename = self.request.get_local_filename()
             self._pix_fmt = None
             self._depth = None
             self._size = None
+            self._queue_size = int(queue_size or 0)
+            if self._queue_size < 0:
+                raise ValueError("FFMPEG queue_size must be a non-negative int")
 
         def _close(self):
-            if self._write_gen is not None:
-                self._write_gen.close()
-                self._write_gen = None
+            # Let the frame writer finish first, it may raise a write error
+            try:
+                if self._frame_writer is not None:
+                    self._frame_writer.stop_me()
+            finally:
+                self._frame_writer = None
+                if self._write_gen is not None:
+                    self._write_gen.close()
+                    self._write_gen = None
 
         def _append_data(self, im, meta):
-            # Get props of image
-            h, w = im.shape[:2]
+            # Get props of image. A 4D array is a batch of frames.
+            original = im
+            is_batch = im.ndim == 4
+            h, w = im.shape[1:3] if is_batch else im.shape[:2]
             size = w, h
-            depth = 1 if im.ndim == 2 else im.shape[2]
+            depth = 1 if im.ndim == 2 else im.shape[-1]
 
             # Ensure that image is in uint8
-            im = image_as_uint(im, bitdepth=8)
+            if is_batch and im.dtype != np.uint8:
+                # Convert each frame as if it had been appended on its own
+                batch = np.empty(im.shape, np.uint8)
+                for i, frame in enumerate(im):
+                    image_as_uint(frame, bitdepth=8, out=batch[i])
+                im = batch
+            else:
+                im = image_as_uint(im, bitdepth=8)
             # To be written efficiently, ie. without creating an immutable
             # buffer, by calling im.tobytes() the array must be contiguous.
             if not im.flags.c_contiguous:
@@ -603,7 +885,13 @@ class FfmpegFormat(Format):
             assert self._write_gen is not None  # Check status
 
             # Write. Yes, we can send the data in as a numpy array
-            self._write_gen.send(im)
+            if self._frame_writer is None:
+                self._write_gen.send(im)
+            else:
+                # The user may modify the array once we return
+                if np.may_share_memory(im, original):
+                    im = im.copy()
+                self._frame_writer.put_frame(im)
 
         def set_meta_data(self, meta):
             raise RuntimeError(
@@ -653,6 +941,89 @@ class FfmpegFormat(Format):
             # Seed the generator (this is where the ffmpeg subprocess starts)
             self._write_gen.send(None)
 
+            # Optionally send the frames from a background thread
+            if self._queue_size:
+                self._frame_writer = FrameWriter(self._write_gen, self._queue_size)
+
+
+class FramePipe:
+    """An ffmpeg subprocess that writes raw frames to stdout, from where they
+    can be read directly into (numpy) buffers.
+
+    ffmpeg is started and its stderr caught as in imageio-ffmpeg's
+    ``read_frames``; ``meta`` holds the metadata parsed from the header that
+    ffmpeg prints before the first frame.
+    """
+
+    def __init__(self, cmd, timeout=10.0):
+        self._process = sp.Popen(
+            cmd,
+            stdin=sp.PIPE,
+            stdout=sp.PIPE,
+            stderr=sp.PIPE,
+            **_popen_kwargs(prevent_sigint=True),
+        )
+        self._log_catcher = LogCatcher(self._process.stderr)
+
+        try:
+            etime = time.time() + timeout
+            while (
+                self._log_catcher.is_alive()
+                and not self._log_catcher.header
+                and time.time() < etime
+            ):
+                time.sleep(0.01)
+
+            header = self._log_catcher.header
+            if not header:
+                raise IOError(
+                    "Could not load meta information\n=== stderr ===\n"
+                    + self._log_catcher.get_text(0.2)
+                )
+            elif "No such file or directory" in header:
+                filename = cmd[cmd.index("-i") + 1]
+                raise IOError("{} not found! Wrong path?".format(filename))
+            self.meta = parse_ffmpeg_header(header)
+        except BaseException:
+            self.close()
+            raise
+
+    def readinto(self, buffer):
+        """Fill the given buffer from ffmpeg's stdout. Returns the number of
+        bytes read, which is less than the size of the buffer only if the end
+        of the stream was reached.
+        """
+        view = memoryview(buffer).cast("B")
+        nbytes = 0
+        while nbytes < len(view):
+            n = self._process.stdout.readinto(view[nbytes:])
+            if not n:
+                break
+            nbytes += n
+        return nbytes
+
+    def frame_error(self, nbytes, framesize):
+        """Get the error for a frame that ended early."""
+        return RuntimeError(
+            "Frame is %i bytes, but expected %i.\n=== stderr ===\n%s"
+            % (nbytes, framesize, self._log_catcher.get_text(0.4))
+        )
+
+    def close(self, timeout=1.5):
+        """Stop ffmpeg, and kill it if it does not quit within timeout."""
+        self._log_catcher.stop_me()
+        try:
+            self._process.stdout.close()
+            self._process.stdin.close()
+        except Exception as err:  # pragma: no cover
+            logger.warning("Error while attempting stop ffmpeg (r): " + str(err))
+        try:
+            self._process.wait(timeout)
+        except sp.TimeoutExpired:  # pragma: no cover
+            logger.warning("We had to kill ffmpeg to stop it.")
+            self._process.kill()
+            self._process.wait()
+
 
 class FrameCatcher(threading.Thread):
     """Thread to keep reading the frame data from stdout. This is
@@ -666,21 +1037,40 @@ class FrameCatcher(threading.Thread):
         self._gen = gen
         self._frame = None
         self._frame_is_new = False
+        self._ended = False
         self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
         threading.Thread.__init__(self)
         self.daemon = True  # do not let this thread hold up Python shutdown
         self._should_stop = False
         self.start()
 
-    def stop_me(self):
+    def stop_me(self, timeout=1.0):
+        """Stop the thread. It stops after it has read the current frame; if
+        ffmpeg stalls, this gives up after timeout seconds."""
         self._should_stop = True
-        while self.is_alive():
-            time.sleep(0.001)
-
-    def get_frame(self):
-        while self._frame is None:  # pragma: no cover - an init thing
-            time.sleep(0.001)
-        with self._lock:
+        self.join(timeout)
+        if self.is_alive():
+            logger.warning("The ffmpeg frame catcher thread did not stop.")
+
+    def get_frame(self, timeout=None, wait_for_new=False):
+        """Get the last available frame and whether it is new, i.e. whether
+        it has not been returned before. Blocks until a frame is available,
+        or, if wait_for_new is True, until a new frame is available. Raises
+        TimeoutError if that takes longer than timeout seconds, and
+        StopIteration if the stream has ended before that.
+        """
+
+        def ready():
+            if wait_for_new:
+                return self._frame_is_new or self._ended
+            return self._frame is not None or self._ended
+
+        with self._condition:
+            if not self._condition.wait_for(ready, timeout):
+                raise TimeoutError("No frame received within %s seconds." % timeout)
+            if self._frame is None or (wait_for_new and not self._frame_is_new):
+                raise StopIteration()
             is_new = self._frame_is_new
             self._frame_is_new = False  # reset
             return self._frame, is_new
@@ -689,13 +1079,123 @@ class FrameCatcher(threading.Thread):
         # This runs in the worker thread
         try:
             while not self._should_stop:
-                time.sleep(0)  # give control to other threads
                 frame = self._gen.__next__()
-                with self._lock:
+                with self._condition:
                     self._frame = frame
                     self._frame_is_new = True
+                    self._condition.notify_all()
         except (StopIteration, EOFError):
             pass
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+
+
+class FramePrefetcher(threading.Thread):
+    """Thread to read frames ahead of time from a video file. The frames
+    are put in a bounded queue, so that ffmpeg can keep decoding while the
+    user code processes the previous frame. The get_frame() method returns
+    the frames in order, and raises StopIteration at the end of the video.
+    """
+
+    def __init__(self, read_frame, size):
+        self._read_frame = read_frame
+        self._size = size
+        self._frames = collections.deque()
+        self._condition = threading.Condition()
+        self._end = None
+        threading.Thread.__init__(self)
+        self.daemon = True  # do not let this thread hold up Python shutdown
+        self._should_stop = False
+        self.start()
+
+    def stop_me(self, timeout=1.0):
+        """Stop the thread. It stops right away if it is waiting for room in
+        the queue, or else after it has read the current frame; if ffmpeg
+        stalls, this gives up after timeout seconds."""
+        with self._condition:
+            self._should_stop = True
+            self._condition.notify_all()
+        self.join(timeout)
+        if self.is_alive():
+            logger.warning("The ffmpeg frame prefetch thread did not stop.")
+
+    def get_frame(self):
+        if self._end is None:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._frames) > 0)
+                item = self._frames.popleft()
+                self._condition.notify_all()
+            if not isinstance(item, BaseException):
+                return item
+            self._end = item
+        raise self._end
+
+    def run(self):
+        # This runs in the worker thread
+        def can_read():
+            return self._should_stop or len(self._frames) < self._size
+
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(can_read)
+                    if self._should_stop:
+                        return
+                frame = self._read_frame()
+                with self._condition:
+                    self._frames.append(frame)
+                    self._condition.notify_all()
+        except Exception as err:
+            # Includes StopIteration; hand it to the reading side
+            with self._condition:
+                self._frames.append(err)
+                self._condition.notify_all()
+
+
+class FrameWriter(threading.Thread):
+    """Thread to send frames to the write generator. The frames are put in a
+    bounded queue, so that the user code can produce the next frame while
+    ffmpeg is encoding. An error that occurs while writing is raised by the
+    next call to put_frame(), or by stop_me() if it has not been raised yet.
+    """
+
+    def __init__(self, gen, size):
+        self._gen = gen
+        self._queue = queue.Queue(maxsize=size)
+        self._error = None
+        self._error_raised = False
+        threading.Thread.__init__(self)
+        self.daemon = True  # do not let this thread hold up Python shutdown
+        self.start()
+
+    def put_frame(self, im):
+        if self._error is not None:
+            self._error_raised = True
+            raise self._error
+        self._queue.put(im)
+
+    def stop_me(self):
+        self._queue.put(None)
+        self.join()
+        if self._error is not None and not self._error_raised:
+            raise self._error
+
+    def run(self):
+        # This runs in the worker thread
+        failed = False
+        while True:
+            im = self._queue.get()
+            if im is None:
+                break
+            elif failed:
+                continue  # keep emptying the queue so that put() won't block
+            try:
+                self._gen.send(im)
+            except Exception as err:
+                self._error = err
+                failed = True
 
 
 def parse_device_names(ffmpeg_output):
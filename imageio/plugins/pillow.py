@@ -30,8 +30,21 @@ Methods
 
 import sys
 import warnings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import numpy as np
 from PIL import ExifTags, GifImagePlugin, Image, ImageSequence, UnidentifiedImageError
@@ -69,6 +82,185 @@ def _exif_orientation_transform(orientation: int, mode: str) -> Callable:
     return EXIF_ORIENTATION.get(orientation, lambda x: x)
 
 
+def _reduced_size(
+    full_size: Tuple[int, int], size: Tuple[int, int], reduce: int
+) -> Tuple[int, int]:
+    # get the (width, height) of an image after applying the
+    # `size` or `reduce` read options to an image of `full_size`
+
+    if size is not None and reduce is not None:
+        raise ValueError("Specify either `size` or `reduce`, not both.")
+
+    if size is not None:
+        width, height = (int(x) for x in size)
+        if width < 1 or height < 1:
+            raise ValueError(f"`size` must be positive, got {size}.")
+        return width, height
+
+    if int(reduce) != reduce or reduce < 1:
+        raise ValueError(f"`reduce` must be a positive integer, got {reduce}.")
+    reduce = int(reduce)
+
+    # same rounding as Image.reduce
+    return tuple((x + reduce - 1) // reduce for x in full_size)
+
+
+def _to_gif_frame(image: Image.Image) -> Image.Image:
+    # convert a frame into a paletted image suitable for GIF encoding;
+    # this mirrors what pillow's GIF encoder does for each frame
+
+    if image.mode == "P":
+        return image
+
+    if Image.getmodebase(image.mode) != "RGB":
+        return image.convert("L").convert("P")
+
+    image = image.convert("P", palette=Image.ADAPTIVE)
+    if image.palette.mode == "RGBA":
+        for rgba, palette_index in image.palette.colors.items():
+            if rgba[3] == 0:
+                image.info["transparency"] = palette_index
+                break
+
+    return image
+
+
+def _ordered_map(
+    func: Callable[[Any], Any], items: Iterator[Any], workers: int
+) -> Iterator[Any]:
+    # map func over items using a pool of `workers` threads; results are
+    # yielded in order and at most 2*workers items are in flight at once
+
+    if workers == 1:
+        yield from map(func, items)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _sample_palette(ndimage: np.ndarray, mode: str, colors: int) -> Image.Image:
+    # compute a shared palette from (up to) 16 evenly spaced frames of a
+    # batch; the frames are stacked vertically and quantized as one image
+
+    sample_idx = np.unique(np.linspace(0, len(ndimage) - 1, 16).round().astype(int))
+    sample = np.concatenate([ndimage[idx] for idx in sample_idx], axis=0)
+
+    if mode is None:
+        sample_image = Image.fromarray(sample)
+    else:
+        sample_image = Image.fromarray(sample, mode=mode)
+
+    return sample_image.convert("RGB").quantize(colors=colors)
+
+
+class _GifStreamWriter:
+    """Incrementally encode an animated GIF.
+
+    Frames are handed to pillow's low-level GIF encoder (``getheader`` and
+    ``getdata``) as they arrive. One frame is held back so that identical
+    consecutive frames can be merged by extending the held frame's duration.
+
+    The palette of the first frame is written as the global color table. Later
+    frames only carry a local color table if their palette differs from it,
+    which is never the case when a shared ``palette`` is given.
+
+    .. note::
+        ``GifImagePlugin.getheader`` and ``GifImagePlugin.getdata`` are not
+        part of pillow's documented API, but they are the only way to encode
+        a GIF frame by frame. They are what pillow itself uses when saving a
+        GIF, and ``getdata`` accepts the same per-frame options (``duration``,
+        ``disposal``, ``transparency``, ``include_color_table``) that
+        ``Image.save`` does.
+
+    Parameters
+    ----------
+    file : file-like
+        The (binary) file to write to.
+    save_args : dict
+        The arguments that would otherwise be passed to ``Image.save``.
+
+    """
+
+    def __init__(self, file, save_args: Dict[str, Any]) -> None:
+        self._file = file
+        self._save_args = save_args
+
+        self._n_frames = 0
+        self._header_written = False
+        self._global_palette: Optional[List[int]] = None
+        self._pending: Optional[Tuple[Image.Image, Dict[str, Any]]] = None
+
+    def write(self, image: Image.Image) -> None:
+        info = {"optimize": self._save_args.get("optimize", True)}
+        for key in ["loop", "duration", "comment", "background"]:
+            if key in self._save_args:
+                info[key] = self._save_args[key]
+
+        frame = _to_gif_frame(image)
+        if "transparency" in frame.info:
+            info["transparency"] = frame.info["transparency"]
+
+        # normalizes (and possibly optimizes) the frame's palette in-place
+        palette = self._save_args.get("palette")
+        header, _ = GifImagePlugin.getheader(frame, palette, info)
+
+        params = {}
+        for key in ["duration", "disposal"]:
+            value = self._save_args.get(key)
+            if isinstance(value, (list, tuple)):
+                value = value[min(self._n_frames, len(value) - 1)]
+            if value is not None:
+                params[key] = value
+        if "transparency" in info:
+            params["transparency"] = info["transparency"]
+        self._n_frames += 1
+
+        if self._pending is not None:
+            pending, pending_params = self._pending
+            if (
+                pending.tobytes() == frame.tobytes()
+                and pending.getpalette() == frame.getpalette()
+                and pending_params.get("transparency") == params.get("transparency")
+            ):
+                if "duration" in params:
+                    pending_params["duration"] = (
+                        pending_params.get("duration", 0) + params["duration"]
+                    )
+                return
+
+            self._write_frame(pending, pending_params)
+
+        if not self._header_written:
+            for chunk in header:
+                self._file.write(chunk)
+            self._header_written = True
+            self._global_palette = frame.getpalette()
+        elif palette is None and frame.getpalette() != self._global_palette:
+            params["include_color_table"] = True
+
+        self._pending = (frame, params)
+
+    def _write_frame(self, frame: Image.Image, params: Dict[str, Any]) -> None:
+        for chunk in GifImagePlugin.getdata(frame, (0, 0), **params):
+            self._file.write(chunk)
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._write_frame(*self._pending)
+            self._pending = None
+
+        if self._header_written:
+            self._file.write(b";")  # end of file
+
+
 class PillowPlugin(PluginV3):
     def __init__(self, request: Request) -> None:
         """Instantiate a new Pillow Plugin Object
@@ -100,6 +292,8 @@ class PillowPlugin(PluginV3):
 
         self._image: Image = None
         self.images_to_write = []
+        self._stream_writer: Optional[_GifStreamWriter] = None
+        self._palette_image: Optional[Image.Image] = None
 
         if request.mode.io_mode == IOMode.read:
             try:
@@ -160,6 +354,9 @@ class PillowPlugin(PluginV3):
         pilmode: str = None,
         exifrotate: bool = None,
         as_gray: bool = None,
+        size: Tuple[int, int] = None,
+        reduce: int = None,
+        reducing_gap: float = None,
     ) -> np.ndarray:
         """
         Parses the given URI and creates a ndarray from it.
@@ -195,6 +392,21 @@ class PillowPlugin(PluginV3):
             Deprecated, use `rotate` instead.
         as_gray : bool
             Deprecated. Exists to raise a constructive error message.
+        size : Tuple[int, int]
+            If not None, decode the image at the given ``(width, height)``
+            instead of at full resolution. For JPEG images this uses pillow's
+            DCT-domain scaling (``Image.draft``) so that the decoder only does
+            work proportional to the output size; other formats are decoded and
+            then downscaled. Mutually exclusive with ``reduce``.
+        reduce : int
+            If not None, decode the image at ``1/reduce`` of its full
+            resolution (rounding up). For JPEG images a factor of 2, 4, or 8
+            is handled entirely inside the decoder. Mutually exclusive with
+            ``size``.
+        reducing_gap : float
+            Passed to pillow's ``Image.resize`` when resampling to the target
+            size. Larger values are more accurate, smaller values are faster.
+            If None (default), pillow's default is used.
 
         Returns
         -------
@@ -251,7 +463,14 @@ class PillowPlugin(PluginV3):
             # will raise IO error if index >= number of frames in image
             self._image.seek(index)
             image = self._apply_transforms(
-                self._image, mode, rotate, apply_gamma, writeable_output
+                self._image,
+                mode,
+                rotate,
+                apply_gamma,
+                writeable_output,
+                size=size,
+                reduce=reduce,
+                reducing_gap=reducing_gap,
             )
         else:
             iterator = self.iter(
@@ -259,6 +478,9 @@ class PillowPlugin(PluginV3):
                 rotate=rotate,
                 apply_gamma=apply_gamma,
                 writeable_output=writeable_output,
+                size=size,
+                reduce=reduce,
+                reducing_gap=reducing_gap,
             )
             image = np.stack([im for im in iterator], axis=0)
 
@@ -271,6 +493,9 @@ class PillowPlugin(PluginV3):
         rotate: bool = False,
         apply_gamma: bool = False,
         writeable_output: bool = True,
+        size: Tuple[int, int] = None,
+        reduce: int = None,
+        reducing_gap: float = None,
     ) -> Iterator[np.ndarray]:
         """
         Iterate over all ndimages/frames in the URI
@@ -292,16 +517,57 @@ class PillowPlugin(PluginV3):
             the user. This incurs a full copy of the pixel data if the data
             served by pillow is read-only. Consequently, setting this flag to
             False improves performance for some images.
+        size : Tuple[int, int]
+            If not None, decode each frame at the given ``(width, height)``.
+            See ``PillowPlugin.read`` for details.
+        reduce : int
+            If not None, decode each frame at ``1/reduce`` of its full
+            resolution. See ``PillowPlugin.read`` for details.
+        reducing_gap : float
+            Passed to pillow's ``Image.resize`` when resampling to the target
+            size. If None (default), pillow's default is used.
         """
 
         for im in ImageSequence.Iterator(self._image):
             yield self._apply_transforms(
-                im, mode, rotate, apply_gamma, writeable_output
+                im,
+                mode,
+                rotate,
+                apply_gamma,
+                writeable_output,
+                size=size,
+                reduce=reduce,
+                reducing_gap=reducing_gap,
             )
 
     def _apply_transforms(
-        self, image, mode, rotate, apply_gamma, writeable_output
+        self,
+        image,
+        mode,
+        rotate,
+        apply_gamma,
+        writeable_output,
+        *,
+        size=None,
+        reduce=None,
+        reducing_gap=None,
     ) -> np.ndarray:
+        target_size = None
+        if size is not None or reduce is not None:
+            target_size = _reduced_size(image.size, size, reduce)
+            if image.format == "JPEG" and target_size != image.size:
+                # Let libjpeg scale in the DCT domain (1/2, 1/4, 1/8). Draft
+                # changes the image in-place, so work on a fresh handle to
+                # keep ``self._image`` at full resolution.
+                file = self.request.get_file()
+                file.seek(0)
+                image = Image.open(file)
+                if reduce is not None:
+                    draft_size = tuple(max(1, x // reduce) for x in image.size)
+                else:
+                    draft_size = target_size
+                image.draft(None, draft_size)
+
         if mode is not None:
             image = image.convert(mode)
         elif image.mode == "P":
@@ -331,6 +597,13 @@ class PillowPlugin(PluginV3):
                 # pillow >= 10.1.0
                 image = image.convert(desired_mode)
 
+        if target_size is not None and image.size != target_size:
+            factor = image.size[0] // target_size[0]
+            if reduce is not None and reduce == factor and image.mode != "1":
+                image = image.reduce(reduce)
+            else:
+                image = image.resize(target_size, reducing_gap=reducing_gap)
+
         image = np.asarray(image)
 
         meta = self.metadata(index=self._image.tell(), exclude_applied=False)
@@ -359,6 +632,9 @@ class PillowPlugin(PluginV3):
         mode: str = None,
         format: str = None,
         is_batch: bool = None,
+        streaming: bool = False,
+        global_palette: bool = False,
+        workers: int = 1,
         **kwargs,
     ) -> Optional[bytes]:
         """
@@ -392,6 +668,26 @@ class PillowPlugin(PluginV3):
             provided ``mode`` or ``image.shape``. While the latter often works,
             it may cause problems for small images due to aliasing of spatial
             and color-channel axes.
+        streaming : bool
+            If True, encode frames as soon as they are written instead of
+            buffering them until the file is closed. This bounds memory use to
+            about two frames, which matters when writing long animations via
+            repeated calls to ``write``. Identical consecutive frames are merged
+            into a single frame with the combined duration. Once enabled,
+            streaming stays active for all subsequent writes to this file.
+            Currently only supported for GIF; other formats fall back to
+            buffered writing with a warning.
+        global_palette : bool
+            If True, compute a single color palette (of ``2**bits`` colors, 256
+            by default) from a sample of the frames and map every frame onto
+            it. This is much faster than computing a palette per frame and,
+            for GIF, avoids storing a local color table with every frame. When
+            writing incrementally, the palette is computed during the first
+            call to ``write`` and reused afterwards. Alpha channels are dropped.
+        workers : int
+            The number of threads used to convert and quantize the frames of a
+            batch. This mainly pays off if frames are quantized (``bits`` or
+            ``global_palette``). Default: 1.
         kwargs : ...
             Extra arguments to pass to pillow. If a writer doesn't recognise an
             option, it is silently ignored. The available options are described
@@ -441,15 +737,6 @@ class PillowPlugin(PluginV3):
         if not is_batch:
             ndimage = ndimage[None, ...]
 
-        for frame in ndimage:
-            if mode is None:
-                pil_frame = Image.fromarray(frame)
-            else:
-                pil_frame = Image.fromarray(frame, mode=mode)
-            if "bits" in kwargs:
-                pil_frame = pil_frame.quantize(colors=2 ** kwargs["bits"])
-            self.images_to_write.append(pil_frame)
-
         if (
             format is not None
             and "format" in self.save_args
@@ -467,6 +754,49 @@ class PillowPlugin(PluginV3):
         self.save_args["format"] = format or Image.registered_extensions()[extension]
         self.save_args.update(kwargs)
 
+        if global_palette and self._palette_image is None:
+            colors = 2 ** kwargs.get("bits", 8)
+            self._palette_image = _sample_palette(ndimage, mode, colors)
+            self.save_args["palette"] = bytes(self._palette_image.getpalette())
+
+        if streaming and self._stream_writer is None:
+            if self.save_args["format"] == "GIF":
+                self._stream_writer = _GifStreamWriter(
+                    self._request.get_file(), self.save_args
+                )
+                for pil_frame in self.images_to_write:
+                    self._stream_writer.write(pil_frame)
+                self.images_to_write.clear()
+            else:
+                warnings.warn(
+                    "Streaming writes are only supported for GIF. Frames will"
+                    " be buffered and written when the file is closed.",
+                    UserWarning,
+                )
+
+        def to_pil(frame: np.ndarray) -> Image.Image:
+            if mode is None:
+                pil_frame = Image.fromarray(frame)
+            else:
+                pil_frame = Image.fromarray(frame, mode=mode)
+
+            if self._palette_image is not None:
+                # the shared palette is RGB; quantizing "L" frames against it
+                # would treat gray values as palette indices
+                if pil_frame.mode != "RGB":
+                    pil_frame = pil_frame.convert("RGB")
+                pil_frame = pil_frame.quantize(palette=self._palette_image)
+            elif "bits" in kwargs:
+                pil_frame = pil_frame.quantize(colors=2 ** kwargs["bits"])
+
+            return pil_frame
+
+        for pil_frame in _ordered_map(to_pil, ndimage, workers):
+            if self._stream_writer is not None:
+                self._stream_writer.write(pil_frame)
+            else:
+                self.images_to_write.append(pil_frame)
+
         # when writing to `bytes` we flush instantly
         result = None
         if self._request._uri_type == URI_BYTES:
@@ -477,6 +807,12 @@ class PillowPlugin(PluginV3):
         return result
 
     def _flush_writer(self):
+        if self._stream_writer is not None:
+            self._stream_writer.close()
+            self._stream_writer = None
+            self._palette_image = None
+            self.save_args.clear()
+
         if len(self.images_to_write) == 0:
             return
 
@@ -488,6 +824,7 @@ class PillowPlugin(PluginV3):
 
         primary_image.save(self._request.get_file(), **self.save_args)
         self.images_to_write.clear()
+        self._palette_image = None
         self.save_args.clear()
 
     def get_meta(self, *, index=0) -> Dict[str, Any]:
@@ -551,7 +888,9 @@ class PillowPlugin(PluginV3):
 
         return metadata
 
-    def properties(self, index: int = None) -> ImageProperties:
+    def properties(
+        self, index: int = None, size: Tuple[int, int] = None, reduce: int = None
+    ) -> ImageProperties:
         """Standardized ndimage metadata
         Parameters
         ----------
@@ -564,6 +903,12 @@ class PillowPlugin(PluginV3):
             properties of the first image (index=0) unless the image is a GIF or
             APNG, in which case it reads and returns the properties all images
             (index=...).
+        size : Tuple[int, int]
+            If not None, report the properties of the ndimage as it would be
+            read with the same ``size`` passed to ``PillowPlugin.read``.
+        reduce : int
+            If not None, report the properties of the ndimage as it would be
+            read with the same ``reduce`` passed to ``PillowPlugin.read``.
 
         Returns
         -------
@@ -597,6 +942,8 @@ class PillowPlugin(PluginV3):
 
         width: int = self._image.width
         height: int = self._image.height
+        if size is not None or reduce is not None:
+            width, height = _reduced_size((width, height), size, reduce)
         shape: Tuple[int, ...] = (height, width)
 
         n_frames: Optional[int] = None
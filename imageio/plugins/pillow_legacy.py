@@ -152,6 +152,16 @@ subrectangles : bool
     If True, will try and optimize the GIF by storing only the
     rectangular parts of each frame that change with respect to the
     previous. Default False.
+workers : int
+    (Only available in GIF-PIL)
+    The number of threads used to quantize frames. Frames are still
+    written in order. Default 1.
+global_palette : bool
+    (Only available in GIF-PIL)
+    If True, compute the palette from the first frame and map all frames
+    onto it. This is much faster than quantizing each frame and avoids
+    local color tables, but colors that first appear in later frames are
+    approximated. Default False.
 
 Notes
 -----
@@ -3,6 +3,8 @@ PIL formats for multiple images.
 """
 
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -35,6 +37,8 @@ class GIFFormat(PillowFormat):
             palettesize=256,
             quantizer=0,
             subrectangles=False,
+            workers=1,
+            global_palette=False,
         ):
             from PIL import __version__ as pillow_version
 
@@ -75,7 +79,13 @@ class GIFFormat(PillowFormat):
 
             fp = self.request.get_file()
             self._writer = GifWriter(
-                fp, subrectangles, loop, quantizer, int(palettesize)
+                fp,
+                subrectangles,
+                loop,
+                quantizer,
+                int(palettesize),
+                opt_workers=int(workers),
+                opt_global_palette=bool(global_palette),
             )
 
         def _close(self):
@@ -94,6 +104,16 @@ class GIFFormat(PillowFormat):
             return
 
 
+class _Done:
+    """A stand-in for a finished future."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+
 def intToBin(i):
     return i.to_bytes(2, byteorder="little")
 
@@ -102,6 +122,13 @@ class GifWriter:  # pragma: no cover
     """Class that for helping write the animated GIF file. This is based on
     code from images2gif.py (part of visvis). The version here is modified
     to allow streamed writing.
+
+    Frames are quantized in a pool of ``opt_workers`` threads, while the
+    (cheap) change detection and the writing happen in order. At most
+    ``2 * opt_workers`` frames are held in memory. With ``opt_global_palette``
+    the palette of the first frame is reused for all frames, which replaces
+    the per-frame palette computation by a (much cheaper) remap and avoids
+    local color tables.
     """
 
     def __init__(
@@ -111,6 +138,8 @@ class GifWriter:  # pragma: no cover
         opt_loop=0,
         opt_quantizer=0,
         opt_palette_size=256,
+        opt_workers=1,
+        opt_global_palette=False,
     ):
         self.fp = file
 
@@ -118,9 +147,16 @@ class GifWriter:  # pragma: no cover
         self.opt_loop = opt_loop
         self.opt_quantizer = opt_quantizer
         self.opt_palette_size = opt_palette_size
+        self.opt_workers = max(1, opt_workers)
+        self.opt_global_palette = opt_global_palette
 
         self._previous_image = None  # as np array
         self._global_palette = None  # as bytes
+        self._palette_image = None  # PIL image holding the shared palette
+        self._queue = deque()  # [im_pil future, rect, duration, dispose]
+        self._executor = None
+        if self.opt_workers > 1:
+            self._executor = ThreadPoolExecutor(self.opt_workers)
         self._count = 0
 
         from PIL.GifImagePlugin import getdata
@@ -128,11 +164,56 @@ class GifWriter:  # pragma: no cover
         self.getdata = getdata
 
     def add_image(self, im, duration, dispose):
+        # Find what changed w.r.t. the previous image
+        box = (0, 0) + im.shape[1::-1]
+        if self._count > 0 and im.shape == self._previous_image.shape:
+            box = self.getChangedBox(im)
+            if box is None:
+                # Same as the previous image; show that one longer instead
+                # of adding an empty frame
+                self._queue[-1][2] += duration
+                self._count += 1
+                return
+
         # Prepare image
         im_rect, rect = im, (0, 0)
         if self.opt_subrectangle:
-            im_rect, rect = self.getSubRectangle(im)
-        im_pil = self.converToPIL(im_rect, self.opt_quantizer, self.opt_palette_size)
+            x0, y0, x1, y1 = box
+            im_rect, rect = im[y0:y1, x0:x1], (x0, y0)
+
+        if self.opt_global_palette and self._palette_image is None:
+            self._palette_image = self.converToPIL(
+                im, self.opt_quantizer, self.opt_palette_size
+            )
+
+        # Quantize in the background; frames are written in order
+        if self._executor is None:
+            im_pil = _Done(self.quantize(im_rect))
+        else:
+            im_pil = self._executor.submit(self.quantize, im_rect)
+        self._queue.append([im_pil, rect, duration, dispose])
+
+        # The last frame is held back, as its duration may still grow
+        while len(self._queue) > 2 * self.opt_workers:
+            self.write_next()
+
+        # Bookkeeping
+        self._previous_image = im
+        self._count += 1
+
+    def quantize(self, im):
+        """Convert a frame to a paletted PIL image, using the shared
+        palette if there is one."""
+        if self._palette_image is None:
+            return self.converToPIL(im, self.opt_quantizer, self.opt_palette_size)
+
+        im_pil = ndarray_to_pil(im, "gif").convert("RGB")
+        return im_pil.quantize(palette=self._palette_image)
+
+    def write_next(self):
+        """Write the oldest queued frame (and the header, if needed)."""
+        im_pil, rect, duration, dispose = self._queue.popleft()
+        im_pil = im_pil.result()
 
         # Get palette - apparently, this is the 3d element of the header
         # (but it has not always been). Best we've got. Its not the same
@@ -140,17 +221,14 @@ class GifWriter:  # pragma: no cover
         from PIL.GifImagePlugin import getheader
 
         palette = getheader(im_pil)[0][3]
+        # Newer Pillow trims the palette to the colors in use, but our
+        # descriptors always announce a 256 color table
+        palette = palette.ljust(768, b"\x00")
 
-        # Write image
-        if self._count == 0:
+        if self._global_palette is None:
             self.write_header(im_pil, palette, self.opt_loop)
             self._global_palette = palette
         self.write_image(im_pil, palette, rect, duration, dispose)
-        # assert len(palette) == len(self._global_palette)
-
-        # Bookkeeping
-        self._previous_image = im
-        self._count += 1
 
     def write_header(self, im, globalPalette, loop):
         # Gather info
@@ -162,6 +240,10 @@ class GifWriter:  # pragma: no cover
         self.fp.write(appext)
 
     def close(self):
+        while self._queue:
+            self.write_next()
+        if self._executor is not None:
+            self._executor.shutdown()
         self.fp.write(";".encode("utf-8"))  # end gif
 
     def write_image(self, im, palette, rect, duration, dispose):
@@ -182,16 +264,16 @@ class GifWriter:  # pragma: no cover
         graphext = self.getGraphicsControlExt(duration, dispose)
 
         # Write local header
-        if (palette != self._global_palette) or (dispose != 2):
+        if palette != self._global_palette:
             # Use local color palette
             fp.write(graphext)
             fp.write(lid)  # write suitable image descriptor
             fp.write(palette)  # write local color table
             fp.write(b"\x08")  # LZW minimum size code
         else:
-            # Use global color palette
+            # Use global color palette; PIL's descriptor is placed at (0, 0)
             fp.write(graphext)
-            fp.write(imdes)  # write suitable image descriptor
+            fp.write(imdes[:1] + intToBin(rect[0]) + intToBin(rect[1]) + imdes[5:])
 
         # Write image data
         for d in data:
@@ -291,25 +373,35 @@ class GifWriter:  # pragma: no cover
         if self._count == 0:
             return im, (0, 0)
 
-        prev = self._previous_image
-
-        # Get difference, sum over colors
-        diff = np.abs(im - prev)
-        if diff.ndim == 3:
-            diff = diff.sum(2)
-        # Get begin and end for both dimensions
-        X = np.argwhere(diff.sum(0))
-        Y = np.argwhere(diff.sum(1))
-        # Get rect coordinates
-        if X.size and Y.size:
-            x0, x1 = int(X[0]), int(X[-1] + 1)
-            y0, y1 = int(Y[0]), int(Y[-1] + 1)
-        else:  # No change ... make it minimal
-            x0, x1 = 0, 2
-            y0, y1 = 0, 2
+        box = self.getChangedBox(im)
+        if box is None:  # No change ... make it minimal
+            return im[:2, :2], (0, 0)
 
+        x0, y0, x1, y1 = box
         return im[y0:y1, x0:x1], (x0, y0)
 
+    def getChangedBox(self, im):
+        """Get the bounding box (x0, y0, x1, y1) of the pixels that differ
+        from the previous image, or None if the images are identical.
+
+        Pixels are compared for equality, so unsigned dtypes can't wrap
+        around, and the columns are only searched within the changed rows.
+        """
+
+        changed = im != self._previous_image
+        if changed.ndim == 3:
+            changed = changed.any(axis=2)
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return None
+        y0, y1 = int(rows[0]), int(rows[-1]) + 1
+
+        cols = np.flatnonzero(changed[y0:y1].any(axis=0))
+        x0, x1 = int(cols[0]), int(cols[-1]) + 1
+
+        return x0, y0, x1, y1
+
     def converToPIL(self, im, quantizer, palette_size=256):
         """Convert image to Paletted PIL image.
 
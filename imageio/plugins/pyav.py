@@ -37,6 +37,8 @@ context:
     PyAVPlugin.set_video_filter
     PyAVPlugin.container_metadata
     PyAVPlugin.video_stream_metadata
+    PyAVPlugin.remux
+    PyAVPlugin.cut_points
 
 Advanced API
 ------------
@@ -175,9 +177,28 @@ examples to better understand how to use them.
 
 """
 
+import io
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
+from inspect import GEN_CLOSED, getgeneratorstate
+from itertools import chain
 from math import ceil
-from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+from queue import Empty, Queue
+from threading import Thread
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import av
 import av.filter
@@ -186,7 +207,13 @@ from av.codec.context import Flags
 from numpy.lib.stride_tricks import as_strided
 
 from ..core import Request
-from ..core.request import URI_BYTES, InitializationError, IOMode
+from ..core.request import (
+    URI_BYTES,
+    URI_FILENAME,
+    URI_HTTP,
+    InitializationError,
+    IOMode,
+)
 from ..core.v3_plugin_api import ImageProperties, PluginV3
 
 
@@ -292,6 +319,110 @@ def _get_frame_type(picture_type: int) -> str:
     return picture_types[picture_type]
 
 
+class _PacketIndex:
+    """A demux-only index of a video stream.
+
+    The index stores, for every frame in presentation order, the frame's pts,
+    whether it is a keyframe, and the byte position of its packet. It is built
+    by demuxing the stream's packets without decoding any of them.
+
+    Parameters
+    ----------
+    pts : np.ndarray
+        The presentation timestamp of each frame (in ascending order).
+    is_keyframe : np.ndarray
+        A boolean mask indicating which frames are keyframes.
+    pos : np.ndarray
+        The byte position of each frame's packet, or -1 if unknown.
+
+    """
+
+    def __init__(
+        self, pts: np.ndarray, is_keyframe: np.ndarray, pos: np.ndarray
+    ) -> None:
+        self.pts = np.asarray(pts, dtype=np.int64)
+        self.is_keyframe = np.asarray(is_keyframe, dtype=bool)
+        self.pos = np.asarray(pos, dtype=np.int64)
+
+        # the index of the closest keyframe at or before each frame
+        keyframe_idx = np.where(self.is_keyframe, np.arange(len(self.pts)), 0)
+        self.keyframe_of = np.maximum.accumulate(keyframe_idx)
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    @classmethod
+    def from_stream(
+        cls, container: av.container.InputContainer, stream: av.VideoStream
+    ) -> "_PacketIndex":
+        """Build the index by demuxing (not decoding) the entire stream."""
+
+        pts, is_keyframe, pos = list(), list(), list()
+
+        container.seek(0)
+        for packet in container.demux(stream):
+            timestamp = packet.pts if packet.pts is not None else packet.dts
+            if timestamp is None:
+                continue  # empty packet used to flush the decoder
+
+            pts.append(timestamp)
+            is_keyframe.append(packet.is_keyframe)
+            pos.append(-1 if packet.pos is None else packet.pos)
+        container.seek(0)
+
+        # packets arrive in decode order; frames are indexed in presentation order
+        order = np.argsort(np.asarray(pts, dtype=np.int64), kind="stable")
+        return cls(
+            np.asarray(pts, dtype=np.int64)[order],
+            np.asarray(is_keyframe, dtype=bool)[order],
+            np.asarray(pos, dtype=np.int64)[order],
+        )
+
+    @classmethod
+    def load(cls, path: str, source_stat: os.stat_result) -> Optional["_PacketIndex"]:
+        """Load an index from a sidecar file. Returns None if it is stale."""
+
+        with np.load(path) as data:
+            source = tuple(int(x) for x in data["source"])
+            if source != (source_stat.st_size, source_stat.st_mtime_ns):
+                return None
+
+            return cls(data["pts"], data["is_keyframe"], data["pos"])
+
+    def save(self, path: str, source_stat: os.stat_result) -> None:
+        """Save the index to a sidecar file."""
+
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                pts=self.pts,
+                is_keyframe=self.is_keyframe,
+                pos=self.pos,
+                source=np.array([source_stat.st_size, source_stat.st_mtime_ns]),
+            )
+
+
+# Packet indices of recently used files; keyed by (path, size, mtime, stream)
+_INDEX_CACHE: "OrderedDict[Tuple[str, int, int, int], _PacketIndex]" = OrderedDict()
+_INDEX_CACHE_SIZE = 32
+
+
+class _ChunkWriter:
+    """A write-only file that passes everything written to it to a callback.
+
+    It isn't seekable, which makes FFmpeg write the container sequentially.
+
+    """
+
+    def __init__(self, callback: Callable[[bytes], None]) -> None:
+        self.callback = callback
+        self.name = None
+
+    def write(self, data) -> int:
+        self.callback(bytes(data))
+        return len(data)
+
+
 class PyAVPlugin(PluginV3):
     """Support for pyAV as backend.
 
@@ -305,12 +436,44 @@ class PyAVPlugin(PluginV3):
     container : str
         Only used during `iio_mode="w"`! If not None, overwrite the default container
         format chosen by pyav.
+    index_sidecar : bool
+        Only used during `iio_mode="r"`! If True and the ImageResource is a
+        local file, persist the packet index used for seeking (see Notes) in a
+        sidecar file named ``<filename>.pyav-index.npz`` and reuse it when the
+        same file is opened again. Default: False.
+    fragmented : bool
+        Only used during `iio_mode="w"`! If True, write MP4/MOV files as
+        fragmented MP4, i.e., as a header followed by self-contained fragments
+        that each start at a keyframe. Such files can be played while they are
+        being written. If None (default), write fragmented MP4 only if
+        ``chunk_callback`` is set.
+    chunk_callback : Callable[[bytes], None]
+        Only used during `iio_mode="w"`! If not None, call it with each chunk
+        of the muxed video as soon as it is produced instead of writing the
+        video to the ImageResource (which stays empty). This allows serving a
+        video while it is being encoded with bounded latency and memory.
     kwargs : Any
         Additional kwargs are forwarded to PyAV's constructor.
 
+    Notes
+    -----
+    To seek exactly, the plugin may build an index of the video's packets
+    (their timestamps, keyframe flags, and byte positions). This only demuxes
+    the file and does not decode any frames. The index of a local file is
+    cached in memory for as long as the file is unchanged.
+
     """
 
-    def __init__(self, request: Request, *, container: str = None, **kwargs) -> None:
+    def __init__(
+        self,
+        request: Request,
+        *,
+        container: str = None,
+        index_sidecar: bool = False,
+        fragmented: bool = None,
+        chunk_callback: Callable[[bytes], None] = None,
+        **kwargs,
+    ) -> None:
         """Initialize a new Plugin Instance.
 
         See Plugin's docstring for detailed documentation.
@@ -328,6 +491,16 @@ class PyAVPlugin(PluginV3):
         self._container = None
         self._video_stream = None
         self._video_filter = None
+        self._video_filter_key = None
+        self._packet_index: Optional[_PacketIndex] = None
+        self._frame_layouts: Dict[tuple, tuple] = dict()
+        self._index_sidecar = index_sidecar
+        self._open_kwargs = kwargs
+        self._frame_pool: Deque[av.VideoFrame] = deque()
+        self._encoder_queue: Optional[Queue] = None
+        self._encoder_thread: Optional[Thread] = None
+        self._encoder_error: Optional[Exception] = None
+        self._encoder_traceback: Optional[TracebackType] = None
 
         if request.mode.io_mode == IOMode.read:
             self._next_idx = 0
@@ -356,6 +529,26 @@ class PyAVPlugin(PluginV3):
             if extension is None:
                 raise InitializationError("Can't determine output container to use.")
 
+            container_options = dict()
+            if chunk_callback is not None:
+                file_handle = _ChunkWriter(chunk_callback)
+                # push each packet to the callback instead of buffering it
+                container_options["flush_packets"] = "1"
+                if fragmented is None:
+                    fragmented = True
+
+            container_name = (container or extension.lstrip(".")).lower()
+            if fragmented and container_name in ("mp4", "mov", "m4v", "ismv"):
+                # the regular MP4 index (moov) is written last and requires a
+                # seekable file; fragmented MP4 puts an empty one first instead
+                container_options["movflags"] = (
+                    "frag_keyframe+empty_moov+default_base_moof"
+                )
+
+            if container_options:
+                container_options.update(kwargs.get("container_options") or dict())
+                kwargs["container_options"] = container_options
+
             # hacky, but beats running our own format selection logic
             # (since av_guess_format is not exposed)
             try:
@@ -379,32 +572,52 @@ class PyAVPlugin(PluginV3):
     def read(
         self,
         *,
-        index: int = ...,
+        index: Union[int, slice, List[int]] = ...,
         format: str = "rgb24",
+        size: Tuple[int, int] = None,
+        scale: float = None,
+        interpolation: str = None,
         filter_sequence: List[Tuple[str, Union[str, dict]]] = None,
         filter_graph: Tuple[dict, List] = None,
         constant_framerate: bool = None,
         thread_count: int = 0,
         thread_type: str = None,
+        skip_frame: str = None,
+        workers: int = 1,
     ) -> np.ndarray:
         """Read frames from the video.
 
         If ``index`` is an integer, this function reads the index-th frame from
         the file. If ``index`` is ... (Ellipsis), this function reads all frames
         from the video, stacks them along the first dimension, and returns a
-        batch of frames.
+        batch of frames. If ``index`` is a slice or a sequence of integers, this
+        function reads the selected frames and returns them as a batch.
 
         Parameters
         ----------
         index : int
             The index of the frame to read, e.g. ``index=5`` reads the 5th
             frame. If ``...``, read all the frames in the video and stack them
+            along a new, prepended, batch dimension. If a slice or a sequence of
+            integers, e.g. ``index=[3, 70, 12]`` or ``index=slice(0, None, 10)``,
+            read the selected frames and stack them (in the requested order)
             along a new, prepended, batch dimension.
         format : str
             Set the returned colorspace. If not None (default: rgb24), convert
             the data into the given format before returning it. If ``None``
             return the data in the encoded format if it can be expressed as a
             strided array; otherwise raise an Exception.
+        size : Tuple[int, int]
+            If not None, scale each frame to the given ``(width, height)`` while
+            converting it into ``format``. This happens in the same (swscale)
+            pass as the color conversion, so no full-resolution frame is
+            allocated. Can't be combined with ``scale``.
+        scale : float
+            If not None, scale each frame by the given factor while converting
+            it into ``format``. Can't be combined with ``size``.
+        interpolation : str
+            The interpolation used for scaling, e.g. ``"BILINEAR"`` or
+            ``"AREA"``. If None (default), use swscale's default.
         filter_sequence : List[str, str, dict]
             If not None, apply the given sequence of FFmpeg filters to each
             ndimage. Check the (module-level) plugin docs for details and
@@ -416,10 +629,13 @@ class PyAVPlugin(PluginV3):
             of edges between nodes of the previous dict. Check the (module-level)
             plugin docs for details and examples.
         constant_framerate : bool
-            If True assume the video's framerate is constant. This allows for
-            faster seeking inside the file. If False, the video is reset before
-            each read and searched from the beginning. If None (default), this
-            value will be read from the container format.
+            If True assume the video's framerate is constant and compute the
+            position of the desired frame from it. This avoids indexing the
+            file, but may be inexact for some files. If False, seek using the
+            video's packet index (see Notes), which is exact for constant and
+            variable framerate videos. If None (default), use the packet index
+            unless the video is read via HTTP, in which case this value will be
+            read from the container format.
         thread_count : int
             How many threads to use when decoding a frame. The default is 0,
             which will set the number using ffmpeg's default, which is based on
@@ -432,6 +648,23 @@ class PyAVPlugin(PluginV3):
             - `"FRAME"`: threads may assemble future frames
             - None (default): Uses ``"FRAME"`` if ``index=...`` and ffmpeg's
               default otherwise.
+        skip_frame : str
+            Only used if ``index=...``. If not None, let the decoder skip frames
+            instead of decoding them, which is much faster. One of
+
+            - `"NONKEY"`: only decode keyframes
+            - `"NONREF"`: skip frames that no other frame references (e.g.
+              b-frames)
+
+            The resulting batch only contains the frames that were decoded. Use
+            ``iter(..., return_frame_info=True)`` to learn their indices.
+        workers : int
+            Only used if ``index=...``. If larger than 1, split the video into
+            this many segments at keyframes and decode the segments
+            concurrently, each from its own container. The result is identical
+            to a sequential read. This requires a file or bytes ImageResource
+            and can't be combined with filters or ``skip_frame``; other
+            resources are read sequentially. Default: 1.
 
 
         Returns
@@ -450,45 +683,58 @@ class PyAVPlugin(PluginV3):
         bidirectionaly predicted pictures. I lack test videos to write unit
         tests for this case.
 
+        Reading a sequence of frames visits them in ascending order, i.e., each
+        group of pictures (the frames between two keyframes) is decoded at most
+        once no matter the order or number of requested indices. This is much
+        faster than reading the frames one by one.
+
         Reading from an index other than ``...``, i.e. reading a single frame,
         currently doesn't support filters that introduce delays.
 
         """
 
+        if index is ... and workers > 1:
+            if filter_sequence is not None or filter_graph is not None:
+                raise ValueError("`workers` can't be combined with filters.")
+            if skip_frame is not None:
+                raise ValueError("`workers` can't be combined with `skip_frame`.")
+
+            if self.request._uri_type in (URI_BYTES, URI_FILENAME):
+                return self._read_parallel(
+                    workers,
+                    format=format,
+                    size=self._output_size(size, scale),
+                    interpolation=interpolation,
+                    thread_count=thread_count,
+                )
+
         if index is ...:
-            props = self.properties(format=format)
-            uses_filter = (
-                self._video_filter is not None
-                or filter_graph is not None
-                or filter_sequence is not None
-            )
+            props = self.properties(format=format, size=size, scale=scale, exact=False)
+
+            # the frame count may be an estimate, and filters or frame skipping
+            # may change it. The batch grows (or shrinks) as needed.
+            n_frames = props.shape[0]
+            if skip_frame is not None:
+                n_frames = 0
 
             self._container.seek(0)
-            if not uses_filter and props.shape[0] != 0:
-                frames = np.empty(props.shape, dtype=props.dtype)
-                for idx, frame in enumerate(
-                    self.iter(
-                        format=format,
-                        filter_sequence=filter_sequence,
-                        filter_graph=filter_graph,
-                        thread_count=thread_count,
-                        thread_type=thread_type or "FRAME",
-                    )
-                ):
-                    frames[idx] = frame
-            else:
-                frames = np.stack(
-                    [
-                        x
-                        for x in self.iter(
-                            format=format,
-                            filter_sequence=filter_sequence,
-                            filter_graph=filter_graph,
-                            thread_count=thread_count,
-                            thread_type=thread_type or "FRAME",
-                        )
-                    ]
-                )
+            self._reset_video_filter()
+            frames = self._read_into_batch(
+                self.iter(
+                    format=format,
+                    size=size,
+                    scale=scale,
+                    interpolation=interpolation,
+                    filter_sequence=filter_sequence,
+                    filter_graph=filter_graph,
+                    thread_count=thread_count,
+                    thread_type=thread_type or "FRAME",
+                    skip_frame=skip_frame,
+                ),
+                n_frames=n_frames,
+                empty_shape=props.shape[1:],
+                dtype=props.dtype,
+            )
 
             # reset stream container, because threading model can't change after
             # first access
@@ -496,6 +742,10 @@ class PyAVPlugin(PluginV3):
 
             return frames
 
+        if skip_frame is not None:
+            raise ValueError("`skip_frame` is only supported when `index=...`.")
+        self._set_skip_frame(None)
+
         if thread_type is not None and not (
             self._video_stream.thread_type == thread_type
             or self._video_stream.thread_type.name == thread_type
@@ -510,31 +760,48 @@ class PyAVPlugin(PluginV3):
             # change to mean don't change the thread count.
             self._video_stream.codec_context.thread_count = thread_count
 
-        if constant_framerate is None:
-            # "variable_fps" is now a flag (handle got removed). Full list at
-            # https://pyav.org/docs/stable/api/container.html#module-av.format
-            variable_fps = bool(self._container.format.flags & 0x400)
-            constant_framerate = not variable_fps
+        size = self._output_size(size, scale)
+
+        if not isinstance(index, (int, np.integer)):
+            return self._read_batch(
+                index,
+                format=format,
+                size=size,
+                interpolation=interpolation,
+                filter_sequence=filter_sequence,
+                filter_graph=filter_graph,
+                constant_framerate=constant_framerate,
+            )
 
         # note: cheap for contiguous incremental reads
         self._seek(index, constant_framerate=constant_framerate)
         desired_frame = next(self._decoder)
         self._next_idx += 1
 
+        # note: cheap if the filter didn't change and we didn't seek
         self.set_video_filter(filter_sequence, filter_graph)
+
         if self._video_filter is not None:
             desired_frame = self._video_filter.send(desired_frame)
 
-        return self._unpack_frame(desired_frame, format=format)
+        return self._unpack_frame(
+            desired_frame, format=format, size=size, interpolation=interpolation
+        )
 
     def iter(
         self,
         *,
         format: str = "rgb24",
+        size: Tuple[int, int] = None,
+        scale: float = None,
+        interpolation: str = None,
         filter_sequence: List[Tuple[str, Union[str, dict]]] = None,
         filter_graph: Tuple[dict, List] = None,
         thread_count: int = 0,
         thread_type: str = None,
+        skip_frame: str = None,
+        return_frame_info: bool = False,
+        out_buffers: int = None,
     ) -> np.ndarray:
         """Yield frames from the video.
 
@@ -546,6 +813,17 @@ class PyAVPlugin(PluginV3):
             Convert the data into the given format before returning it. If None,
             return the data in the encoded format if it can be expressed as a
             strided array; otherwise raise an Exception.
+        size : Tuple[int, int]
+            If not None, scale each frame to the given ``(width, height)`` while
+            converting it into ``format``. This happens in the same (swscale)
+            pass as the color conversion, so no full-resolution frame is
+            allocated. Can't be combined with ``scale``.
+        scale : float
+            If not None, scale each frame by the given factor while converting
+            it into ``format``. Can't be combined with ``size``.
+        interpolation : str
+            The interpolation used for scaling, e.g. ``"BILINEAR"`` or
+            ``"AREA"``. If None (default), use swscale's default.
         filter_sequence : List[str, str, dict]
             Set the returned colorspace. If not None (default: rgb24), convert
             the data into the given format before returning it. If ``None``
@@ -567,12 +845,33 @@ class PyAVPlugin(PluginV3):
 
             - `"SLICE"` (default): threads assemble parts of the current frame
             - `"FRAME"`: threads may assemble future frames (faster for bulk reading)
+        skip_frame : str
+            If not None, let the decoder skip frames instead of decoding them,
+            which is much faster. One of
+
+            - `"NONKEY"`: only decode keyframes
+            - `"NONREF"`: skip frames that no other frame references (e.g.
+              b-frames)
+
+            Changing this value restarts iteration at the first frame.
+        return_frame_info : bool
+            If True, yield a ``(frame, info)`` tuple instead of only the frame.
+            ``info`` is a dict containing the frame's ``index``, ``pts``,
+            ``time``, and ``key_frame`` flag. Default: False.
+        out_buffers : int
+            If not None, unpack frames into a ring of ``out_buffers``
+            preallocated arrays instead of allocating a new array for each
+            frame. A yielded array is overwritten ``out_buffers`` frames later,
+            so copy it if you need to keep it for longer.
 
 
         Yields
         ------
         frame : np.ndarray
             A (decoded) video frame.
+        info : dict
+            Only if ``return_frame_info=True``. Where the frame is located
+            inside the video.
 
 
         """
@@ -580,11 +879,63 @@ class PyAVPlugin(PluginV3):
         self._video_stream.thread_type = thread_type or "SLICE"
         self._video_stream.codec_context.thread_count = thread_count
 
+        size = self._output_size(size, scale)
+
+        # frames can't be counted while skipping or filtering; look them up
+        # instead. Note: building the index rewinds file objects.
+        packet_index = None
+        if skip_frame is not None or (
+            return_frame_info
+            and (filter_sequence is not None or filter_graph is not None)
+        ):
+            packet_index = self._get_packet_index()
+
+        self._set_skip_frame(skip_frame)
         self.set_video_filter(filter_sequence, filter_graph)
 
+        if out_buffers is not None and out_buffers < 1:
+            raise ValueError(f"`out_buffers` must be positive, not `{out_buffers}`.")
+        ring = list()
+        n_unpacked = 0
+
+        def yield_frame(frame):
+            nonlocal n_unpacked
+
+            out = None
+            if out_buffers is not None and len(ring) == out_buffers:
+                out = ring[n_unpacked % out_buffers]
+
+            image = self._unpack_frame(
+                frame, format=format, size=size, interpolation=interpolation, out=out
+            )
+            if out_buffers is not None and len(ring) < out_buffers:
+                # the ring fills up with (copies of) the first frames
+                image = np.array(image)
+                ring.append(image)
+            n_unpacked += 1
+
+            if not return_frame_info:
+                return image
+
+            if packet_index is not None:
+                index = int(np.searchsorted(packet_index.pts, frame.pts))
+            else:
+                index = self._next_idx - 1
+
+            info = {
+                "index": index,
+                "pts": frame.pts,
+                "time": frame.time,
+                "key_frame": bool(frame.key_frame),
+            }
+            return image, info
+
         for frame in self._decoder:
             self._next_idx += 1
 
+            if skip_frame is not None:
+                self._next_idx = int(np.searchsorted(packet_index.pts, frame.pts)) + 1
+
             if self._video_filter is not None:
                 try:
                     frame = self._video_filter.send(frame)
@@ -594,11 +945,11 @@ class PyAVPlugin(PluginV3):
             if frame is None:
                 continue
 
-            yield self._unpack_frame(frame, format=format)
+            yield yield_frame(frame)
 
         if self._video_filter is not None:
             for frame in self._video_filter:
-                yield self._unpack_frame(frame, format=format)
+                yield yield_frame(frame)
 
     def write(
         self,
@@ -686,7 +1037,15 @@ class PyAVPlugin(PluginV3):
 
             return self.request.get_file().getvalue()
 
-    def properties(self, index: int = ..., *, format: str = "rgb24") -> ImageProperties:
+    def properties(
+        self,
+        index: int = ...,
+        *,
+        format: str = "rgb24",
+        size: Tuple[int, int] = None,
+        scale: float = None,
+        exact: bool = None,
+    ) -> ImageProperties:
         """Standardized ndimage metadata.
 
         Parameters
@@ -700,6 +1059,20 @@ class PyAVPlugin(PluginV3):
             before returning it. If None return the data in the encoded format
             if that can be expressed as a strided array; otherwise raise an
             Exception.
+        size : Tuple[int, int]
+            If not None, return the properties of frames scaled to the given
+            ``(width, height)``.
+        scale : float
+            If not None, return the properties of frames scaled by the given
+            factor.
+        exact : bool
+            How to determine the number of frames if ``index=...``. If True,
+            count the video's packets (see the plugin's Notes). If False, use
+            the number of frames stored in the video stream or, if the stream
+            doesn't store it, estimate it from the stream's duration. If None
+            (default), use the stored number if available and count packets
+            otherwise, except for file objects and HTTP resources. Counting
+            their packets would rewind the video, so they are estimated.
 
         Returns
         -------
@@ -708,7 +1081,8 @@ class PyAVPlugin(PluginV3):
 
         Notes
         -----
-        This function is efficient and won't process any pixel data.
+        This function is efficient and won't process any pixel data. Counting
+        packets only demuxes the video and the result is cached.
 
         The provided metadata does not include modifications by any filters
         (through ``filter_sequence`` or ``filter_graph``).
@@ -717,13 +1091,15 @@ class PyAVPlugin(PluginV3):
 
         video_width = self._video_stream.codec_context.width
         video_height = self._video_stream.codec_context.height
+        output_size = self._output_size(size, scale)
+        if output_size is not None:
+            video_width, video_height = output_size
         pix_format = format or self._video_stream.codec_context.pix_fmt
         frame_template = av.VideoFrame(video_width, video_height, pix_format)
 
         shape = _get_frame_shape(frame_template)
         if index is ...:
-            n_frames = self._video_stream.frames
-            shape = (n_frames,) + shape
+            shape = (self._count_frames(exact=exact),) + shape
 
         return ImageProperties(
             shape=tuple(shape),
@@ -753,10 +1129,13 @@ class PyAVPlugin(PluginV3):
             Currently, this parameter has no effect. It exists for compliance with
             the ImageIO v3 API.
         constant_framerate : bool
-            If True assume the video's framerate is constant. This allows for
-            faster seeking inside the file. If False, the video is reset before
-            each read and searched from the beginning. If None (default), this
-            value will be read from the container format.
+            If True assume the video's framerate is constant and compute the
+            position of the desired frame from it. This avoids indexing the
+            file, but may be inexact for some files. If False, seek using the
+            video's packet index (see Notes), which is exact for constant and
+            variable framerate videos. If None (default), use the packet index
+            unless the video is read via HTTP, in which case this value will be
+            read from the container format.
 
         Returns
         -------
@@ -789,12 +1168,7 @@ class PyAVPlugin(PluginV3):
             metadata.update(self.video_stream_metadata)
             return metadata
 
-        if constant_framerate is None:
-            # "variable_fps" is now a flag (handle got removed). Full list at
-            # https://pyav.org/docs/stable/api/container.html#module-av.format
-            variable_fps = bool(self._container.format.flags & 0x400)
-            constant_framerate = not variable_fps
-
+        self._set_skip_frame(None)
         self._seek(index, constant_framerate=constant_framerate)
         desired_frame = next(self._decoder)
         self._next_idx += 1
@@ -820,20 +1194,30 @@ class PyAVPlugin(PluginV3):
         """Close the Video."""
 
         is_write = self.request.mode.io_mode == IOMode.write
-        if is_write and self._video_stream is not None:
-            self._flush_writer()
+        try:
+            if is_write and self._video_stream is not None:
+                self._flush_writer()
+        finally:
+            if self._video_stream is not None:
+                self._video_stream = None
 
-        if self._video_stream is not None:
-            self._video_stream = None
+            if self._container is not None:
+                self._container.close()
 
-        if self._container is not None:
-            self._container.close()
+            self.request.finish()
 
-        self.request.finish()
+        # a failed encoder thread fails every close, not just the first
+        self._raise_encoder_error()
 
     def __enter__(self) -> "PyAVPlugin":
         return super().__enter__()
 
+    def __del__(self) -> None:
+        # an encoder error has been raised by write_frame or close already;
+        # don't raise it yet again while collecting the plugin
+        self._encoder_error = None
+        super().__del__()
+
     # ------------------------------
     # Add-on Interface inside imopen
     # ------------------------------
@@ -846,6 +1230,9 @@ class PyAVPlugin(PluginV3):
         pixel_format: str = None,
         max_keyframe_interval: int = None,
         force_keyframes: bool = None,
+        thread_count: int = None,
+        thread_type: str = None,
+        queue_size: int = None,
     ) -> None:
         """Initialize a new video stream.
 
@@ -869,6 +1256,19 @@ class PyAVPlugin(PluginV3):
             If True, limit inter frames dependency to frames within the current
             keyframe interval (GOP), i.e., force every I-frame to be a keyframe.
             If unspecified, use the codec's default.
+        thread_count : int
+            How many threads the encoder may use. If unspecified, use the
+            codec's default. 0 lets FFmpeg choose based on the number of cores.
+        thread_type : str
+            The encoder's threading model, ``"SLICE"`` or ``"FRAME"``. If
+            unspecified, use the codec's default.
+        queue_size : int
+            If not None, encode and mux frames on a background thread.
+            ``write_frame`` then only copies the frame into a (reused)
+            av.VideoFrame and queues it, blocking only if ``queue_size`` frames
+            are waiting to be encoded. This lets producing frames and encoding
+            them overlap. Errors raised while encoding surface in the next call
+            to ``write_frame`` or when closing the plugin.
 
         Notes
         -----
@@ -895,9 +1295,21 @@ class PyAVPlugin(PluginV3):
                 stream.codec_context.flags |= Flags.closed_gop
             else:
                 stream.codec_context.flags &= ~Flags.closed_gop
+        if thread_count is not None:
+            stream.codec_context.thread_count = thread_count
+        if thread_type is not None:
+            stream.codec_context.thread_type = thread_type
 
         self._video_stream = stream
 
+        if queue_size is not None:
+            if queue_size < 1:
+                raise ValueError(f"`queue_size` must be positive, not `{queue_size}`.")
+
+            self._encoder_queue = Queue(maxsize=queue_size)
+            self._encoder_thread = Thread(target=self._encoder_worker, daemon=True)
+            self._encoder_thread.start()
+
     def write_frame(self, frame: np.ndarray, *, pixel_format: str = "rgb24") -> None:
         """Add a frame to the video stream.
 
@@ -921,6 +1333,8 @@ class PyAVPlugin(PluginV3):
 
         """
 
+        self._raise_encoder_error()
+
         # manual packing of ndarray into frame
         # (this should live in pyAV, but it doesn't support all the formats we
         # want and PRs there are slow)
@@ -928,7 +1342,7 @@ class PyAVPlugin(PluginV3):
         img_dtype = _format_to_dtype(pixel_format)
         width = frame.shape[2 if pixel_format.is_planar else 1]
         height = frame.shape[1 if pixel_format.is_planar else 0]
-        av_frame = av.VideoFrame(width, height, pixel_format.name)
+        av_frame = self._get_pooled_frame(width, height, pixel_format.name)
         if pixel_format.is_planar:
             for idx, plane in enumerate(av_frame.planes):
                 plane_array = np.frombuffer(plane, dtype=img_dtype)
@@ -967,17 +1381,99 @@ class PyAVPlugin(PluginV3):
         av_frame.pts = self.frames_written
         self.frames_written += 1
 
+        if self._encoder_queue is not None:
+            self._encoder_queue.put(av_frame)
+        else:
+            self._encode_frame(av_frame)
+
+    def _get_pooled_frame(self, width: int, height: int, format: str) -> av.VideoFrame:
+        """Get a writable av.VideoFrame, reusing one that was encoded already."""
+
+        while self._frame_pool:
+            av_frame = self._frame_pool.popleft()
+            if (av_frame.width, av_frame.height, av_frame.format.name) != (
+                width,
+                height,
+                format,
+            ):
+                continue
+
+            # The encoder (or filter) may still reference the frame's buffers,
+            # e.g., to use it as a reference frame. In this case, this
+            # allocates new buffers instead of overwriting the old ones.
+            av_frame.make_writable()
+            return av_frame
+
+        return av.VideoFrame(width, height, format)
+
+    def _encode_frame(self, av_frame: av.VideoFrame) -> None:
+        """Filter, encode, and mux a frame, then return it to the pool."""
+
+        stream = self._video_stream
+        pooled_frame = av_frame
+
         if self._video_filter is not None:
             av_frame = self._video_filter.send(av_frame)
-            if av_frame is None:
+
+        if av_frame is not None:
+            if not stream.codec_context.is_open:
+                stream.width = av_frame.width
+                stream.height = av_frame.height
+
+            for packet in stream.encode(av_frame):
+                self._container.mux(packet)
+
+        self._frame_pool.append(pooled_frame)
+
+    def _encoder_worker(self) -> None:
+        """Encode queued frames until a None is queued (background thread)."""
+
+        while True:
+            av_frame = self._encoder_queue.get()
+            try:
+                if av_frame is None:
+                    return
+                self._encode_frame(av_frame)
+            except Exception as e:
+                # re-raised on the producer's thread
+                self._encoder_traceback = e.__traceback__
+                self._encoder_error = e
+                break
+            finally:
+                self._encoder_queue.task_done()
+
+        # stop encoding, and drop the queued frames so that a producer that
+        # is blocked on a full queue wakes up and sees the error
+        while True:
+            try:
+                self._encoder_queue.get_nowait()
+            except Empty:
                 return
+            self._encoder_queue.task_done()
 
-        if stream.frames == 0:
-            stream.width = av_frame.width
-            stream.height = av_frame.height
+    def _raise_encoder_error(self) -> None:
+        """Re-raise an exception that occurred on the encoder thread.
 
-        for packet in stream.encode(av_frame):
-            self._container.mux(packet)
+        The error is kept, so that every later write (and close) raises it
+        again.
+
+        """
+
+        if self._encoder_error is not None:
+            # raise it with its original traceback, instead of growing it
+            raise self._encoder_error.with_traceback(self._encoder_traceback)
+
+    def _stop_encoder_thread(self) -> None:
+        """Wait for the encoder thread to encode all queued frames and stop."""
+
+        if self._encoder_queue is None:
+            return
+
+        if self._encoder_error is None:
+            self._encoder_queue.put(None)
+        self._encoder_thread.join()
+        self._encoder_queue = None
+        self._encoder_thread = None
 
     def set_video_filter(
         self,
@@ -1009,10 +1505,35 @@ class PyAVPlugin(PluginV3):
         Changing a filter graph with lag during reading or writing will
         currently cause frames in the filter queue to be lost.
 
+        Setting the same filter(s) again is cheap. The existing graph (and its
+        state) is kept unless the video was seeked in the meantime.
+
         """
 
+        if self._encoder_queue is not None:
+            # the encoder thread may still be using the current filter
+            self._raise_encoder_error()
+            self._encoder_queue.join()
+
         if filter_sequence is None and filter_graph is None:
             self._video_filter = None
+            self._video_filter_key = None
+            return
+
+        codec_context = self._video_stream.codec_context
+        filter_key = (
+            repr(filter_sequence),
+            repr(filter_graph),
+            codec_context.width,
+            codec_context.height,
+            codec_context.pix_fmt,
+            self._video_stream.time_base,
+        )
+        if (
+            filter_key == self._video_filter_key
+            and self._video_filter is not None
+            and getgeneratorstate(self._video_filter) != GEN_CLOSED
+        ):
             return
 
         if filter_sequence is None:
@@ -1085,6 +1606,12 @@ class PyAVPlugin(PluginV3):
 
         self._video_filter = video_filter()
         self._video_filter.send(None)
+        self._video_filter_key = filter_key
+
+    def _reset_video_filter(self) -> None:
+        """Rebuild the filter graph on next use, e.g., because we seeked."""
+
+        self._video_filter_key = None
 
     @property
     def container_metadata(self):
@@ -1104,11 +1631,177 @@ class PyAVPlugin(PluginV3):
         """
         return self._video_stream.metadata
 
+    def cut_points(
+        self, start: float = None, stop: float = None
+    ) -> Tuple[float, Optional[float]]:
+        """The keyframe-aligned range that ``remux`` copies.
+
+        Parameters
+        ----------
+        start : float
+            The desired start time (in seconds). If None, start at the
+            beginning of the video.
+        stop : float
+            The desired stop time (in seconds). If None, stop at the end of the
+            video.
+
+        Returns
+        -------
+        start : float
+            The time of the last keyframe at or before the desired start.
+        stop : float
+            The time of the first keyframe at or after the desired stop, or None
+            if the range extends to the end of the video.
+
+        """
+
+        packet_index = self._get_packet_index()
+        start_idx, stop_idx = self._cut_indices(start, stop)
+        times = packet_index.pts * float(self._video_stream.time_base)
+
+        start_time = float(times[start_idx])
+        stop_time = float(times[stop_idx]) if stop_idx < len(times) else None
+        return start_time, stop_time
+
+    def remux(
+        self,
+        uri,
+        *,
+        start: float = None,
+        stop: float = None,
+        extension: str = None,
+        format_hint: str = None,
+        video_only: bool = False,
+    ) -> Optional[bytes]:
+        """Copy the video into a new container without re-encoding it.
+
+        Packets are copied as-is (stream copy), which makes this an I/O-bound
+        operation that is much faster than decoding and re-encoding. Use it to
+        change the container (e.g. MKV to MP4), to cut a clip, or to extract
+        the video stream.
+
+        Parameters
+        ----------
+        uri : {str, pathlib.Path, bytes, file}
+            The resource to write the new container to. Use ``"<bytes>"`` to
+            return it as a bytes string.
+        start : float
+            If not None, the time (in seconds) at which the clip starts. Since
+            packets are copied, it is moved to the last keyframe at or before
+            this time.
+        stop : float
+            If not None, the time (in seconds) at which the clip ends. It is
+            moved to the first keyframe at or after this time.
+        extension : str
+            If not None, use this extension to select the output container
+            instead of the one of ``uri``.
+        format_hint : str
+            A hint for the output container if it can't be determined from
+            ``uri`` or ``extension``.
+        video_only : bool
+            If True, only copy the video stream. Otherwise (default), also copy
+            the audio streams in the selected time range.
+
+        Returns
+        -------
+        encoded_video : bytes
+            The new container, if ``uri="<bytes>"``. Otherwise None.
+
+        Notes
+        -----
+        Use ``cut_points`` to learn the keyframe-aligned range that will be
+        copied for a given ``start`` and ``stop``.
+
+        """
+
+        packet_index = self._get_packet_index()
+        start_idx, stop_idx = self._cut_indices(start, stop)
+        start_pts = int(packet_index.pts[start_idx])
+        stop_pts = None
+        if stop_idx < len(packet_index):
+            stop_pts = int(packet_index.pts[stop_idx])
+
+        video_stream = self._video_stream
+        start_time = start_pts * video_stream.time_base
+        stop_time = None if stop_pts is None else stop_pts * video_stream.time_base
+
+        in_streams = [video_stream]
+        if not video_only:
+            in_streams += list(self._container.streams.audio)
+
+        request = Request(uri, "w", extension=extension, format_hint=format_hint)
+        with PyAVPlugin(request) as out_file:
+            out_streams = {
+                stream.index: out_file._container.add_stream_from_template(stream)
+                for stream in in_streams
+            }
+
+            # streams that may still have packets inside the clip
+            pending = set(out_streams.keys())
+
+            self._container.seek(start_pts, stream=video_stream)
+            for packet in self._container.demux(in_streams):
+                if packet.size == 0:
+                    continue  # empty packet used to flush the decoder
+
+                stream_index = packet.stream.index
+                timestamp = packet.pts if packet.pts is not None else packet.dts
+                if timestamp is None or stream_index not in pending:
+                    continue
+
+                if stream_index == video_stream.index:
+                    if packet.is_keyframe and timestamp == stop_pts:
+                        pending.remove(stream_index)
+                    # skip leading frames that reference the previous GOP
+                    inside = timestamp >= start_pts
+                else:
+                    time = timestamp * packet.time_base
+                    if stop_time is not None and time >= stop_time:
+                        pending.remove(stream_index)
+                    inside = time >= start_time
+
+                if not pending:
+                    break
+                if not inside or stream_index not in pending:
+                    continue
+
+                # shift the clip to start at zero
+                offset = int(start_time / packet.time_base)
+                if packet.pts is not None:
+                    packet.pts -= offset
+                if packet.dts is not None:
+                    packet.dts -= offset
+
+                packet.stream = out_streams[stream_index]
+                out_file._container.mux(packet)
+
+            if request._uri_type == URI_BYTES:
+                out_file._container.close()
+                result = request.get_file().getvalue()
+            else:
+                result = None
+
+        # we moved the read position; start over
+        self._container.seek(0)
+        self._decoder = self._container.decode(video=0)
+        self._next_idx = 0
+        self._reset_video_filter()
+
+        return result
+
     # -------------------------------
     # Internals and private functions
     # -------------------------------
 
-    def _unpack_frame(self, frame: av.VideoFrame, *, format: str = None) -> np.ndarray:
+    def _unpack_frame(
+        self,
+        frame: av.VideoFrame,
+        *,
+        format: str = None,
+        size: Tuple[int, int] = None,
+        interpolation: str = None,
+        out: np.ndarray = None,
+    ) -> np.ndarray:
         """Convert a av.VideoFrame into a ndarray
 
         Parameters
@@ -1117,16 +1810,74 @@ class PyAVPlugin(PluginV3):
             The frame to unpack.
         format : str
             If not None, convert the frame to the given format before unpacking.
+        size : Tuple[int, int]
+            If not None, scale the frame to the given (width, height) before
+            unpacking.
+        interpolation : str
+            The interpolation to use when scaling the frame.
+        out : np.ndarray
+            If not None, copy the frame's data into this (C-contiguous) array
+            and return it. Otherwise, the result may be a view into the frame's
+            memory.
 
         """
 
-        if format is not None:
+        if size is not None:
+            frame = frame.reformat(
+                width=size[0],
+                height=size[1],
+                format=format,
+                interpolation=interpolation,
+            )
+        elif format is not None:
             frame = frame.reformat(format=format)
 
+        dtype, shape, plane_layouts = self._get_frame_layout(frame)
+
+        planes = list()
+        for av_plane, (plane_shape, plane_strides) in zip(frame.planes, plane_layouts):
+            np_plane = as_strided(
+                np.frombuffer(av_plane, dtype=dtype),
+                shape=plane_shape,
+                strides=plane_strides,
+            )
+            planes.append(np_plane)
+
+        if len(planes) > 1:
+            # Note: the planes *should* exist inside a contiguous memory block
+            # somewhere inside av.Frame however pyAV does not appear to expose this,
+            # so we are forced to copy the planes individually instead of wrapping
+            # them :(
+            if out is None:
+                out = np.concatenate(planes).reshape(shape)
+            else:
+                np.concatenate(planes, out=out.reshape((-1,) + planes[0].shape[1:]))
+        elif out is None:
+            out = planes[0]
+        else:
+            out[...] = planes[0]
+
+        return out
+
+    def _get_frame_layout(
+        self, frame: av.VideoFrame
+    ) -> Tuple[np.dtype, Tuple[int, ...], List[Tuple[tuple, tuple]]]:
+        """The dtype, shape, and (shape, strides) of each plane of a frame.
+
+        The layout only depends on the frame's format, size, and line sizes, so
+        it is computed once and then reused for all frames that share them.
+
+        """
+
+        line_sizes = tuple(plane.line_size for plane in frame.planes)
+        key = (frame.format.name, frame.width, frame.height, line_sizes)
+        if key in self._frame_layouts:
+            return self._frame_layouts[key]
+
         dtype = _format_to_dtype(frame.format)
         shape = _get_frame_shape(frame)
 
-        planes = list()
+        plane_layouts = list()
         for idx in range(len(frame.planes)):
             n_channels = sum(
                 [
@@ -1141,26 +1892,305 @@ class PyAVPlugin(PluginV3):
             if n_channels > 1:
                 plane_shape += (n_channels,)
                 plane_strides += (dtype.itemsize,)
+            plane_layouts.append((plane_shape, plane_strides))
 
-            np_plane = as_strided(
-                np.frombuffer(av_plane, dtype=dtype),
-                shape=plane_shape,
-                strides=plane_strides,
+        self._frame_layouts[key] = (dtype, shape, plane_layouts)
+        return self._frame_layouts[key]
+
+    def _cut_indices(self, start: Optional[float], stop: Optional[float]):
+        """The frame indices of the keyframes to cut a clip at.
+
+        The start is moved back to the last keyframe at or before ``start``,
+        and the (exclusive) stop is moved forward to the first keyframe at or
+        after ``stop``, or the end of the video.
+
+        """
+
+        packet_index = self._get_packet_index()
+        times = packet_index.pts * float(self._video_stream.time_base)
+
+        start_idx = 0
+        if start is not None:
+            start_idx = max(0, np.searchsorted(times, start, side="right") - 1)
+            start_idx = int(packet_index.keyframe_of[start_idx])
+
+        stop_idx = len(times)
+        if stop is not None:
+            candidates = np.flatnonzero(
+                packet_index.is_keyframe & (times >= stop) & (times > times[start_idx])
             )
-            planes.append(np_plane)
+            if candidates.size > 0:
+                stop_idx = int(candidates[0])
 
-        if len(planes) > 1:
-            # Note: the planes *should* exist inside a contiguous memory block
-            # somewhere inside av.Frame however pyAV does not appear to expose this,
-            # so we are forced to copy the planes individually instead of wrapping
-            # them :(
-            out = np.concatenate(planes).reshape(shape)
+        return start_idx, stop_idx
+
+    def _count_frames(self, *, exact: bool = None) -> int:
+        """The number of frames in the video stream.
+
+        See ``properties`` for the meaning of ``exact``.
+
+        """
+
+        if exact:
+            return len(self._get_packet_index())
+
+        n_frames = self._video_stream.frames
+        if n_frames > 0:
+            return n_frames
+
+        # only index implicitly if it doesn't rewind the video
+        if exact is None and self.request._uri_type in (URI_BYTES, URI_FILENAME):
+            return len(self._get_packet_index())
+
+        return self._estimate_n_frames()
+
+    def _estimate_n_frames(self) -> int:
+        """Estimate the number of frames from the stream's duration.
+
+        Returns 0 if neither the stream nor the container know their duration.
+
+        """
+
+        stream = self._video_stream
+        rate = stream.average_rate or stream.guessed_rate
+        if rate is None:
+            return 0
+
+        if stream.duration is not None:
+            duration = stream.duration * stream.time_base
+        elif self._container.duration is not None:
+            duration = Fraction(self._container.duration, av.time_base)
         else:
-            out = planes[0]
+            return 0
 
-        return out
+        return max(0, ceil(duration * rate))
+
+    def _read_into_batch(
+        self,
+        images: Generator,
+        *,
+        n_frames: int,
+        empty_shape: Tuple[int, ...],
+        dtype: np.dtype,
+    ) -> np.ndarray:
+        """Stack the given images into a batch without keeping a list of them.
+
+        The batch is allocated from the shape of the first image and is grown
+        geometrically (in place where the allocator allows it) if more than
+        ``n_frames`` images arrive. Unused capacity is released at the end.
+
+        """
+
+        frames = None
+        n_read = 0
+        for image in images:
+            if frames is None:
+                capacity = n_frames or 16
+                frames = np.empty((capacity,) + image.shape, dtype=image.dtype)
+            elif n_read == frames.shape[0]:
+                frames.resize((2 * n_read,) + frames.shape[1:], refcheck=False)
+
+            frames[n_read] = image
+            n_read += 1
+
+        if frames is None:
+            return np.empty((0,) + tuple(empty_shape), dtype=dtype)
+
+        if n_read != frames.shape[0]:
+            frames.resize((n_read,) + frames.shape[1:], refcheck=False)
+
+        return frames
+
+    def _output_size(
+        self, size: Optional[Tuple[int, int]], scale: Optional[float]
+    ) -> Optional[Tuple[int, int]]:
+        """The (width, height) to scale frames to, or None to keep them."""
+
+        if size is not None and scale is not None:
+            raise ValueError("Only one of `size` and `scale` can be set.")
+
+        if scale is not None:
+            if scale <= 0:
+                raise ValueError(f"`scale` must be positive, not `{scale}`.")
+
+            codec_context = self._video_stream.codec_context
+            size = (
+                max(1, round(codec_context.width * scale)),
+                max(1, round(codec_context.height * scale)),
+            )
+
+        if size is None:
+            return None
+
+        width, height = (int(x) for x in size)
+        if width < 1 or height < 1:
+            raise ValueError(f"`size` must be positive, not `{size}`.")
+
+        return width, height
+
+    def _set_skip_frame(self, skip_frame: Optional[str]) -> None:
+        """Configure which frames the decoder skips.
+
+        Changing the value rewinds the video, because frames decoded after
+        skipping may reference frames that were never decoded.
+
+        """
+
+        codec_context = self._video_stream.codec_context
+        skip_frame = skip_frame or "DEFAULT"
+        if codec_context.skip_frame == skip_frame:
+            return
+
+        codec_context.skip_frame = skip_frame
+        self._container.seek(0)
+        self._decoder = self._container.decode(video=0)
+        self._next_idx = 0
+        self._reset_video_filter()
+
+    def _read_parallel(
+        self,
+        workers: int,
+        *,
+        format: str = "rgb24",
+        size: Tuple[int, int] = None,
+        interpolation: str = None,
+        thread_count: int = 0,
+    ) -> np.ndarray:
+        """Decode all frames using multiple containers at once.
+
+        The video is split into ``workers`` segments of (roughly) equal length
+        that start at a keyframe. Each segment is decoded by a separate
+        container in a separate thread and written into its own slice of the
+        preallocated batch.
+
+        """
+
+        packet_index = self._get_packet_index()
+        n_frames = len(packet_index)
+        props = self.properties(index=0, format=format, size=size)
+        frames = np.empty((n_frames,) + props.shape, dtype=props.dtype)
+
+        # segments start at the keyframe closest to an even split
+        keyframes = np.flatnonzero(packet_index.is_keyframe)
+        splits = np.linspace(0, n_frames, workers + 1)[1:-1]
+        closest = np.searchsorted(keyframes, splits, side="right") - 1
+        starts = keyframes[closest[closest >= 0]]
+        bounds = np.unique(np.concatenate([[0], starts, [n_frames]]))
+
+        if thread_count == 0:
+            # split the cores among the decoders instead of oversubscribing
+            thread_count = max(1, (os.cpu_count() or 1) // workers)
 
-    def _seek(self, index, *, constant_framerate: bool = True) -> Generator:
+        if self.request._uri_type == URI_BYTES:
+            source = self.request.raw_uri
+        else:
+            source = self.request.filename
+
+        def decode_segment(start: int, stop: int) -> bool:
+            file = io.BytesIO(source) if isinstance(source, bytes) else source
+            with av.open(file, **self._open_kwargs) as container:
+                stream = container.streams[self._video_stream.index]
+                stream.codec_context.thread_count = thread_count
+
+                start_pts = int(packet_index.pts[start])
+                container.seek(start_pts, stream=stream)
+
+                idx = start
+                for frame in container.decode(stream):
+                    if frame.pts is not None and frame.pts < start_pts:
+                        continue  # leading frame of the previous segment
+                    if idx == stop:
+                        break
+
+                    self._unpack_frame(
+                        frame,
+                        format=format,
+                        size=size,
+                        interpolation=interpolation,
+                        out=frames[idx],
+                    )
+                    idx += 1
+
+            return idx == stop
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            complete = list(executor.map(decode_segment, bounds[:-1], bounds[1:]))
+
+        if not all(complete):
+            # a segment decoded fewer frames than it has packets; only a
+            # sequential read can tell which frames exist
+            return self.read(
+                index=...,
+                format=format,
+                size=size,
+                interpolation=interpolation,
+                thread_count=thread_count,
+            )
+
+        return frames
+
+    def _read_batch(
+        self,
+        index: Union[slice, List[int]],
+        *,
+        format: str = "rgb24",
+        size: Tuple[int, int] = None,
+        interpolation: str = None,
+        filter_sequence: List[Tuple[str, Union[str, dict]]] = None,
+        filter_graph: Tuple[dict, List] = None,
+        constant_framerate: bool = None,
+    ) -> np.ndarray:
+        """Read the frames at the given indices into a single batch.
+
+        The frames are decoded in ascending order so that each GOP is decoded
+        at most once, and each frame is written into a preallocated batch at
+        the position(s) at which it was requested.
+
+        """
+
+        if isinstance(index, slice):
+            n_frames = len(self._get_packet_index())
+            indices = np.arange(*index.indices(n_frames))
+        else:
+            indices = np.asarray(index, dtype=np.int64).reshape(-1)
+            if np.any(indices < 0):
+                n_frames = len(self._get_packet_index())
+                indices = np.where(indices < 0, indices + n_frames, indices)
+
+        if indices.size == 0:
+            props = self.properties(index=0, format=format, size=size)
+            return np.empty((0,) + props.shape, dtype=props.dtype)
+
+        frames = None
+        last_idx, last_position = None, None
+        for position in np.argsort(indices, kind="stable"):
+            idx = int(indices[position])
+
+            if idx == last_idx:
+                # requested more than once
+                frames[position] = frames[last_position]
+                continue
+
+            self._seek(idx, constant_framerate=constant_framerate)
+            frame = next(self._decoder)
+            self._next_idx += 1
+
+            self.set_video_filter(filter_sequence, filter_graph)
+            if self._video_filter is not None:
+                frame = self._video_filter.send(frame)
+
+            image = self._unpack_frame(
+                frame, format=format, size=size, interpolation=interpolation
+            )
+            if frames is None:
+                frames = np.empty((len(indices),) + image.shape, dtype=image.dtype)
+            frames[position] = image
+
+            last_idx, last_position = idx, position
+
+        return frames
+
+    def _seek(self, index, *, constant_framerate: bool = None) -> Generator:
         """Seeks to the frame at the given index."""
 
         if index == self._next_idx:
@@ -1175,49 +2205,156 @@ class PyAVPlugin(PluginV3):
             if index == self._next_idx:
                 return  # fast path :)
 
-        # remove this branch until I find a way to efficiently find the next
-        # keyframe. keeping this as a reminder
-        # if self._next_idx < index and index < self._next_keyframe_idx:
-        #     frames_to_yield = index - self._next_idx
-        if not constant_framerate and index > self._next_idx:
-            frames_to_yield = index - self._next_idx
-        elif not constant_framerate:
-            # seek backwards and can't link idx and pts
-            self._container.seek(0)
-            self._decoder = self._container.decode(video=0)
-            self._next_idx = 0
+        if constant_framerate is None and self.request._uri_type == URI_HTTP:
+            # indexing a remote file means downloading all of it. Instead,
+            # check the container's "variable_fps" flag. Full list at
+            # https://pyav.org/docs/stable/api/container.html#module-av.format
+            variable_fps = bool(self._container.format.flags & 0x400)
+            constant_framerate = not variable_fps
 
-            frames_to_yield = index
-        else:
-            # we know that the time between consecutive frames is constant
-            # hence we can link index and pts
+        # the packet index is exact for CFR and VFR videos, but it has to be
+        # built first. Computing the target's pts avoids that for CFR videos.
+        if not constant_framerate or self._get_packet_index(build=False) is not None:
+            self._seek_indexed(index)
+            return
 
-            # how many pts lie between two frames
-            sec_delta = 1 / self._video_stream.guessed_rate
-            pts_delta = sec_delta / self._video_stream.time_base
+        # we know that the time between consecutive frames is constant
+        # hence we can link index and pts
 
-            index_pts = int(index * pts_delta)
+        # how many pts lie between two frames
+        sec_delta = 1 / self._video_stream.guessed_rate
+        pts_delta = sec_delta / self._video_stream.time_base
 
-            # this only seeks to the closest (preceding) keyframe
-            self._container.seek(index_pts, stream=self._video_stream)
-            self._decoder = self._container.decode(video=0)
+        index_pts = int(index * pts_delta)
+
+        # this only seeks to the closest (preceding) keyframe
+        self._container.seek(index_pts, stream=self._video_stream)
+        self._decoder = self._container.decode(video=0)
+        self._reset_video_filter()
 
-            # this may be made faster if we could get the keyframe's time without
-            # decoding it
-            keyframe = next(self._decoder)
-            keyframe_time = keyframe.pts * keyframe.time_base
-            keyframe_pts = int(keyframe_time / self._video_stream.time_base)
-            keyframe_index = keyframe_pts // pts_delta
+        # this may be made faster if we could get the keyframe's time without
+        # decoding it
+        keyframe = next(self._decoder)
+        keyframe_time = keyframe.pts * keyframe.time_base
+        keyframe_pts = int(keyframe_time / self._video_stream.time_base)
+        keyframe_index = keyframe_pts // pts_delta
 
-            self._container.seek(index_pts, stream=self._video_stream)
-            self._next_idx = keyframe_index
+        self._container.seek(index_pts, stream=self._video_stream)
+        self._next_idx = keyframe_index
 
-            frames_to_yield = index - keyframe_index
+        frames_to_yield = index - keyframe_index
 
         for _ in range(frames_to_yield):
             next(self._decoder)
             self._next_idx += 1
 
+    def _seek_indexed(self, index: int) -> None:
+        """Seek to the frame at the given index using the packet index.
+
+        This seeks to the closest keyframe at or before the desired frame
+        (unless it is faster to decode forward from the current position) and
+        then decodes until it reaches the frame's pts. Cost is O(GOP size).
+
+        """
+
+        packet_index = self._get_packet_index()
+
+        if index < 0 or index >= len(packet_index):
+            raise IndexError(
+                f"Index `{index}` is out of bounds for a video with "
+                f"{len(packet_index)} frames."
+            )
+
+        keyframe_index = packet_index.keyframe_of[index]
+        if not (keyframe_index <= self._next_idx <= index):
+            keyframe_pts = int(packet_index.pts[keyframe_index])
+            self._container.seek(keyframe_pts, stream=self._video_stream)
+            self._decoder = self._container.decode(video=0)
+            self._reset_video_filter()
+
+        target_pts = packet_index.pts[index]
+        for frame in self._decoder:
+            if frame.pts is None or frame.pts >= target_pts:
+                break
+        else:
+            raise IndexError(f"Could not find the frame at index `{index}`.")
+
+        # put the frame back so that the next decoded frame is the desired one
+        self._decoder = chain([frame], self._decoder)
+        self._next_idx = index
+
+    def _get_packet_index(self, *, build: bool = True) -> Optional[_PacketIndex]:
+        """Get the packet index of the video stream.
+
+        The index is looked up in (1) this plugin instance, (2) the in-memory
+        cache of recently indexed files, and (3) the sidecar file (if
+        enabled). If none of those has it and ``build`` is True, the index is
+        built by demuxing the video; otherwise None is returned.
+
+        """
+
+        if self._packet_index is not None:
+            return self._packet_index
+
+        key = None
+        sidecar = None
+        if self.request._uri_type == URI_FILENAME:
+            filename = self.request.filename
+            source_stat = os.stat(filename)
+            key = (
+                os.path.abspath(filename),
+                source_stat.st_size,
+                source_stat.st_mtime_ns,
+                self._video_stream.index,
+            )
+
+            if self._index_sidecar:
+                sidecar = filename + ".pyav-index.npz"
+
+            if key in _INDEX_CACHE:
+                _INDEX_CACHE.move_to_end(key)
+                self._packet_index = _INDEX_CACHE[key]
+            elif sidecar is not None and os.path.exists(sidecar):
+                try:
+                    self._packet_index = _PacketIndex.load(sidecar, source_stat)
+                except (OSError, ValueError, KeyError):
+                    pass  # corrupt sidecar; rebuild it
+
+        if self._packet_index is None:
+            if not build:
+                return None
+
+            if self.request._uri_type in (URI_BYTES, URI_FILENAME):
+                # demux a second container to keep the current read position
+                if self.request._uri_type == URI_BYTES:
+                    source = io.BytesIO(self.request.raw_uri)
+                else:
+                    source = self.request.filename
+                with av.open(source, **self._open_kwargs) as container:
+                    self._packet_index = _PacketIndex.from_stream(
+                        container, container.streams[self._video_stream.index]
+                    )
+            else:
+                self._packet_index = _PacketIndex.from_stream(
+                    self._container, self._video_stream
+                )
+                self._decoder = self._container.decode(video=0)
+                self._next_idx = 0
+                self._reset_video_filter()
+
+            if sidecar is not None:
+                try:
+                    self._packet_index.save(sidecar, source_stat)
+                except OSError:
+                    pass  # read-only location; keep the index in memory
+
+        if key is not None:
+            _INDEX_CACHE[key] = self._packet_index
+            while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+                _INDEX_CACHE.popitem(last=False)
+
+        return self._packet_index
+
     def _flush_writer(self):
         """Flush the filter and encoder
 
@@ -1226,17 +2363,21 @@ class PyAVPlugin(PluginV3):
 
         """
 
+        self._stop_encoder_thread()
+        self._raise_encoder_error()
+
         stream = self._video_stream
 
         if self._video_filter is not None:
             # flush encoder
             for av_frame in self._video_filter:
-                if stream.frames == 0:
+                if not stream.codec_context.is_open:
                     stream.width = av_frame.width
                     stream.height = av_frame.height
                 for packet in stream.encode(av_frame):
                     self._container.mux(packet)
             self._video_filter = None
+            self._video_filter_key = None
 
         # flush stream
         for packet in stream.encode():
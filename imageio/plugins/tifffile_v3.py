@@ -44,16 +44,23 @@ context:
 """
 
 from io import BytesIO
-from typing import Any, Dict, Optional, cast
+from typing import Any, Dict, Optional, Tuple, cast
 import warnings
 
 import numpy as np
 import tifffile
 
-from ..core.request import URI_BYTES, InitializationError, Request
+from ..core.request import URI_BYTES, URI_FILENAME, InitializationError, Request
 from ..core.v3_plugin_api import ImageProperties, PluginV3
 from ..typing import ArrayLike
 
+# Region reads decode single strips or tiles with ``TiffPage.decode``, which
+# tells where a segment goes. Older tifffile versions that lack it (along with
+# ``TiffPage.segments``) decode the full page instead.
+_HAS_SEGMENT_API = hasattr(tifffile.TiffPage, "segments") and hasattr(
+    tifffile.TiffPage, "decode"
+)
+
 
 def _get_resolution(page: tifffile.TiffPage) -> Dict[str, Any]:
     metadata = {}
@@ -85,6 +92,160 @@ def _get_resolution(page: tifffile.TiffPage) -> Dict[str, Any]:
     return metadata
 
 
+def _region_bounds(region: slice, size: int) -> range:
+    """Resolve a region slice against an axis of the given size."""
+    if not isinstance(region, slice):
+        raise ValueError(f"`region` must contain slices, not `{region!r}`.")
+
+    selection = range(*region.indices(size))
+    if selection.step < 1:
+        raise ValueError("`region` does not support negative steps.")
+
+    return selection
+
+
+def _read_page_region(
+    page: tifffile.TiffPage, rows: range, cols: range, depth: range = None
+) -> np.ndarray:
+    """Decode the part of a page that lies inside a region.
+
+    Only the strips or tiles that intersect the region's bounding box are read
+    and decoded. The result has the (squeezed) layout of ``page.asarray()``
+    with the spatial axes cropped to the region.
+
+    """
+    keyframe = page.keyframe
+
+    if depth is None:
+        depth = range(keyframe.imagedepth)
+
+    bounds = []
+    for axis in (depth, rows, cols):
+        if len(axis) == 0:
+            bounds.append((0, 0))
+        else:
+            bounds.append((axis[0], axis[-1] + 1))
+    (d0, d1), (y0, y1), (x0, x1) = bounds
+
+    n_separate, _, _, _, n_contig = keyframe.shaped
+    result = np.empty(
+        (n_separate, d1 - d0, y1 - y0, x1 - x0, n_contig), dtype=keyframe.dtype
+    )
+
+    if result.size == 0:
+        pass
+    elif (
+        not _HAS_SEGMENT_API
+        or len(page.dataoffsets) == 0
+        or keyframe.jpegheader is not None
+    ):
+        # no segments to select from (or NDPI's striped JPEG); decode it all
+        full = page.asarray(squeeze=False)
+        result[:] = full[:, d0:d1, y0:y1, x0:x1]
+    elif keyframe.is_final:
+        # uncompressed and contiguous; read the rows directly
+        fh = page.parent.filehandle
+        dtype = keyframe.dtype.newbyteorder(keyframe.parent.byteorder)
+        _, depth_size, length, width, _ = keyframe.shaped
+        row_items = width * n_contig
+        full_rows = x0 == 0 and x1 == width
+
+        with fh.lock:
+            for s in range(n_separate):
+                for d in range(d0, d1):
+                    plane = (s * depth_size + d) * length
+                    for y in [y0] if full_rows else range(y0, y1):
+                        offset = (plane + y) * row_items + x0 * n_contig
+                        count = (y1 - y0 if full_rows else 1) * (x1 - x0) * n_contig
+                        fh.seek(page.dataoffsets[0] + offset * dtype.itemsize)
+                        data = np.frombuffer(fh.read(count * dtype.itemsize), dtype)
+                        if full_rows:
+                            target = result[s, d - d0]
+                        else:
+                            target = result[s, d - d0, y - y0]
+                        target.reshape(-1)[:] = data
+    else:
+        _decode_segments(page, result, bounds)
+
+    result = result[:, :: depth.step, :: rows.step, :: cols.step]
+    return result.reshape(_region_shape(keyframe, rows, cols, depth))
+
+
+def _decode_segments(page: tifffile.TiffPage, result: np.ndarray, bounds) -> None:
+    """Decode the strips or tiles of a page that intersect ``bounds`` into
+    ``result``.
+
+    Segments are read in file order and decoded one at a time using the
+    pattern documented in ``tifffile.TiffPage.decode``.
+
+    """
+    keyframe = page.keyframe
+    (d0, d1), (y0, y1), (x0, x1) = bounds
+    n_separate = result.shape[0]
+
+    if keyframe.is_tiled:
+        seg_depth = keyframe.tiledepth
+        seg_length = keyframe.tilelength
+        seg_width = keyframe.tilewidth
+    else:
+        seg_depth = 1
+        seg_length = keyframe.rowsperstrip
+        seg_width = keyframe.imagewidth
+    n_depth = -(-keyframe.imagedepth // seg_depth)
+    n_length = -(-keyframe.imagelength // seg_length)
+    n_width = -(-keyframe.imagewidth // seg_width)
+
+    indices = [
+        ((s * n_depth + d) * n_length + y) * n_width + x
+        for s in range(n_separate)
+        for d in range(d0 // seg_depth, -(-d1 // seg_depth))
+        for y in range(y0 // seg_length, -(-y1 // seg_length))
+        for x in range(x0 // seg_width, -(-x1 // seg_width))
+    ]
+    indices.sort(key=lambda i: page.dataoffsets[i])
+
+    fh = page.parent.filehandle
+    with fh.lock:
+        segments = []
+        for index in indices:
+            if page.databytecounts[index] == 0:
+                segments.append((None, index))
+                continue
+            fh.seek(page.dataoffsets[index])
+            segments.append((fh.read(page.databytecounts[index]), index))
+
+    for data, index in segments:
+        segment, (s, d, y, x, _), shape = keyframe.decode(
+            data, index, jpegtables=page.jpegtables
+        )
+
+        # overlap between segment and region
+        sd0, sd1 = max(d, d0), min(d + shape[0], d1)
+        sy0, sy1 = max(y, y0), min(y + shape[1], y1)
+        sx0, sx1 = max(x, x0), min(x + shape[2], x1)
+        target = result[
+            s, sd0 - d0 : sd1 - d0, sy0 - y0 : sy1 - y0, sx0 - x0 : sx1 - x0
+        ]
+
+        if segment is None:
+            target[:] = keyframe.nodata
+        else:
+            target[:] = segment[sd0 - d : sd1 - d, sy0 - y : sy1 - y, sx0 - x : sx1 - x]
+
+
+def _region_shape(
+    keyframe: tifffile.TiffPage, rows: range, cols: range, depth: range = None
+) -> Tuple[int, ...]:
+    """The (squeezed) shape of a page's region."""
+    cropped = {"Y": len(rows), "X": len(cols)}
+    if depth is not None:
+        cropped["Z"] = len(depth)
+
+    return tuple(
+        cropped.get(axis, size) for axis, size in zip(keyframe.axes, keyframe.shape)
+    )
+
+
 class TifffilePlugin(PluginV3):
     """Support for tifffile as backend.
 
@@ -116,7 +277,15 @@ class TifffilePlugin(PluginV3):
     # Standard V3 Interface
     # ---------------------
 
-    def read(self, *, index: int = None, page: int = None, **kwargs) -> np.ndarray:
+    def read(
+        self,
+        *,
+        index: int = None,
+        page: int = None,
+        region: Tuple[slice, ...] = None,
+        memmap: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
         """Read a ndimage or page.
 
         The ndimage returned depends on the value of both ``index`` and
@@ -137,6 +306,17 @@ class TifffilePlugin(PluginV3):
         page : int
             If ``None`` return the full selected ndimage. If ``int``, read the
             page at the selected index and return it.
+        region : Tuple[slice, ...]
+            If not ``None``, a tuple ``(slice_y, slice_x)`` or ``(slice_z,
+            slice_y, slice_x)`` selecting a region of interest. Only the strips
+            or tiles that intersect the region are decoded. ``slice_z`` selects
+            along the depth of volumetric (tiled) pages or, otherwise, along the
+            pages of the selected series.
+        memmap : bool
+            If True, and the ImageResource is a local file in which the selected
+            ndimage or page is stored uncompressed and contiguously, return a
+            read-only ``np.memmap`` of the data instead of reading it into
+            memory. Otherwise, fall back to a normal read.
         kwargs : Any
             Additional kwargs are forwarded to TiffFile's ``as_array`` method.
 
@@ -144,6 +324,13 @@ class TifffilePlugin(PluginV3):
         -------
         ndarray : np.ndarray
             The decoded ndimage or page.
+
+        Notes
+        -----
+        When reading a region of a series, the series' leading (non-page)
+        dimensions are kept if they can be mapped onto its pages; otherwise the
+        pages are stacked along a new first axis.
+
         """
 
         if "key" not in kwargs:
@@ -161,7 +348,19 @@ class TifffilePlugin(PluginV3):
         else:
             index = 0
 
-        if index is Ellipsis and page is None:
+        if memmap and region is not None:
+            raise ValueError("Can't use `memmap` and `region` at the same time.")
+
+        ndimage = None
+        if memmap and kwargs.keys() == {"key"}:
+            # falls back to a normal read if the data can't be mapped
+            ndimage = self._memmap(index, kwargs["key"])
+
+        if ndimage is not None:
+            pass
+        elif region is not None:
+            ndimage = self._read_region(index, region, **kwargs)
+        elif index is Ellipsis and page is None:
             # read all series in the file and return them as a batch
             ndimage = np.stack([x for x in self.iter(**kwargs)])
         else:
@@ -395,6 +594,94 @@ class TifffilePlugin(PluginV3):
 
         super().close()
 
+    def _memmap(self, index: int, key: int = None) -> Optional[np.memmap]:
+        """Map a series or page into memory, if it is stored suitably."""
+
+        filehandle = self._fh.filehandle
+        if self._request._uri_type != URI_FILENAME or not filehandle.is_file:
+            return None
+
+        if index is Ellipsis and key is None:
+            return None
+        elif index is Ellipsis and isinstance(key, int):
+            target = self._fh.pages[key]
+        elif isinstance(key, int):
+            target = self._fh.series[index].pages[key]
+        elif key is None:
+            series = self._fh.series[index]
+            if series.dataoffset is None or not series.keyframe.is_memmappable:
+                return None
+
+            return filehandle.memmap_array(
+                series.dtype.newbyteorder(self._fh.byteorder),
+                series.shape,
+                series.dataoffset,
+            )
+        else:
+            return None
+
+        if target is None or not target.is_memmappable:
+            return None
+
+        keyframe = target.keyframe
+        return filehandle.memmap_array(
+            keyframe.dtype.newbyteorder(self._fh.byteorder),
+            keyframe.shape,
+            target.dataoffsets[0],
+        )
+
+    def _read_region(
+        self, index: int, region: Tuple[slice, ...], *, key: int = None, **kwargs
+    ) -> np.ndarray:
+        """Read a region of interest from a series or page."""
+
+        if kwargs:
+            raise ValueError(f"`region` can't be combined with `{next(iter(kwargs))}`.")
+        if len(region) not in (2, 3):
+            raise ValueError("`region` must be `([slice_z,] slice_y, slice_x)`.")
+
+        if index is Ellipsis and key is None:
+            return np.stack(
+                [self._read_region(idx, region) for idx in range(len(self._fh.series))]
+            )
+        elif index is Ellipsis:
+            pages = [self._fh.pages[key]]
+            leading = ()
+        elif key is not None:
+            pages = [self._fh.series[index].pages[key]]
+            leading = ()
+        else:
+            series = self._fh.series[index]
+            pages = list(series.pages)
+            page_ndim = len(series.keyframe.shape)
+            leading = series.shape[:-page_ndim]
+            if series.shape[-page_ndim:] != series.keyframe.shape or np.prod(
+                leading, dtype=np.intp
+            ) != len(pages):
+                leading = (len(pages),)
+
+        keyframe = pages[0].keyframe
+        *slice_z, slice_y, slice_x = region
+        rows = _region_bounds(slice_y, keyframe.imagelength)
+        cols = _region_bounds(slice_x, keyframe.imagewidth)
+
+        depth = None
+        if slice_z and keyframe.imagedepth > 1:
+            depth = _region_bounds(slice_z[0], keyframe.imagedepth)
+        elif slice_z:
+            pages = [pages[idx] for idx in _region_bounds(slice_z[0], len(pages))]
+            leading = (len(pages),)
+
+        if len(pages) == 1 and leading == ():
+            return _read_page_region(pages[0], rows, cols, depth)
+
+        data = [_read_page_region(page, rows, cols, depth) for page in pages]
+        if len(data) == 0:
+            shape = _region_shape(keyframe, rows, cols, depth)
+            return np.empty((0, *shape), dtype=keyframe.dtype)
+
+        return np.stack(data).reshape(leading + data[0].shape)
+
     # ------------------------------
     # Add-on Interface inside imopen
     # ------------------------------
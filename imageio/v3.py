@@ -1,9 +1,104 @@
+import dataclasses
+import inspect
+
 import numpy as np
 
 from .core.imopen import imopen
+from .core.legacy_plugin_wrapper import LegacyPlugin
+from .core.util import _CHUNK_SIZE
+
+_LAYOUTS = ("HWC", "CHW")
+
+
+def _check_layout(layout):
+    if layout not in _LAYOUTS:
+        raise ValueError(f"`layout` must be one of {_LAYOUTS}, not `{layout}`.")
+
+
+def _takes_argument(img_file, method, name):
+    """Check if ``method`` of a plugin (or, for legacy plugins, the format's
+    reader) takes an argument called ``name``."""
+    if isinstance(img_file, LegacyPlugin):
+        method = img_file._format.Reader._open
+    return name in inspect.signature(method).parameters
 
 
-def imread(uri, *, index=None, plugin=None, extension=None, format_hint=None, **kwargs):
+def _output_dtype(dtype, value_scale, in_dtype):
+    if dtype is not None:
+        return np.dtype(dtype)
+    elif value_scale is not None:
+        return np.result_type(in_dtype, float(value_scale))
+    return np.dtype(in_dtype)
+
+
+def _output_shape(shape, layout):
+    if layout == "HWC":
+        return tuple(shape)
+    elif len(shape) == 2:
+        return (1, *shape)
+    elif len(shape) >= 3 and shape[-1] in (1, 3, 4):
+        return (*shape[:-3], shape[-1], *shape[-3:-1])
+    raise ValueError(
+        f"Can't use `layout='CHW'` for an ndimage of shape {tuple(shape)}; its "
+        "last axis is not a channel axis (of size 1, 3, or 4)."
+    )
+
+
+def _convert_image(image, dtype=None, value_scale=None, layout="HWC"):
+    """Convert an ndimage to the given dtype and layout and multiply it by
+    value_scale, in one pass and without full-size temporaries.
+
+    For "CHW", 2D ndimages get a channel axis; otherwise the last axis must be
+    a channel axis.
+    """
+    no_conversion = dtype is None and value_scale is None and layout == "HWC"
+    if no_conversion and isinstance(image, np.memmap):
+        # keep memory-mapped reads memory-mapped
+        return image
+
+    image = np.asarray(image)
+    out_dtype = _output_dtype(dtype, value_scale, image.dtype)
+    if value_scale is None and layout == "HWC" and out_dtype == image.dtype:
+        return image
+
+    out = np.empty(_output_shape(image.shape, layout), out_dtype)
+    if layout == "HWC" or image.ndim < 2:
+        source = image
+    elif image.ndim == 2:
+        source = image[np.newaxis]
+    else:
+        source = np.moveaxis(image, -1, -3)
+    if out.ndim < 2 or out.size == 0:
+        if value_scale is not None:
+            source = source * value_scale
+        np.copyto(out, source, casting="unsafe")
+        return out
+
+    # Process bands of rows across all leading axes, so that each chunk
+    # stays in the CPU cache
+    n_rows = out.shape[-2]
+    step = max(1, _CHUNK_SIZE * n_rows // out.size)
+    for i in range(0, n_rows, step):
+        src, dst = source[..., i : i + step, :], out[..., i : i + step, :]
+        if value_scale is None:
+            np.copyto(dst, src, casting="unsafe")
+        else:
+            np.multiply(src, value_scale, out=dst, dtype=out_dtype, casting="unsafe")
+    return out
+
+
+def imread(
+    uri,
+    *,
+    index=None,
+    plugin=None,
+    extension=None,
+    format_hint=None,
+    dtype=None,
+    value_scale=None,
+    layout="HWC",
+    **kwargs,
+):
     """Read an ndimage from a URI.
 
     Opens the given URI and reads an ndimage from it. The exact behavior
@@ -30,6 +125,19 @@ def imread(uri, *, index=None, plugin=None, extension=None, format_hint=None, **
         extension. This affects the order in which backends are considered.
     format_hint : str
         Deprecated. Use `extension` instead.
+    dtype : {str, np.dtype, None}
+        If not None, cast the ndimage to this dtype. Plugins that take a
+        ``dtype`` argument themselves receive it instead (see Notes).
+    value_scale : {float, None}
+        If not None, multiply the pixel values by this value, e.g. ``1/255``
+        to map uint8 images into [0, 1]. Without ``dtype``, the result is
+        float (float64, unless the ndimage has another float dtype).
+    layout : {"HWC", "CHW"}
+        The order of the last three axes. "HWC" (default) leaves the ndimage
+        as the plugin returns it. "CHW" moves the last (channel) axis in front
+        of the two spatial axes; 2D images get a channel axis of size 1. Other
+        ndimages must have a channel axis of size 1, 3, or 4 last, else a
+        ValueError is raised.
     **kwargs :
         Additional keyword arguments will be passed to the plugin's read call.
 
@@ -37,6 +145,16 @@ def imread(uri, *, index=None, plugin=None, extension=None, format_hint=None, **
     -------
     image : ndimage
         The ndimage located at the given URI.
+
+    Notes
+    -----
+    ``dtype``, ``value_scale`` and ``layout`` are applied by imageio after the
+    plugin has read the ndimage, together and in chunks, so the only
+    full-size array that is created is the contiguous result. If the plugin's
+    reader takes a ``dtype`` argument itself, ``dtype`` is passed on to it, so
+    that the plugin can decode at that depth natively; e.g. the legacy FFMPEG
+    plugin decodes video at 16 bit for ``dtype="uint16"``.
+
     """
 
     plugin_kwargs = {
@@ -46,15 +164,31 @@ def imread(uri, *, index=None, plugin=None, extension=None, format_hint=None, **
         "extension": extension,
     }
 
+    _check_layout(layout)
+
     call_kwargs = kwargs
     if index is not None:
         call_kwargs["index"] = index
 
     with imopen(uri, "r", **plugin_kwargs) as img_file:
-        return np.asarray(img_file.read(**call_kwargs))
-
-
-def imiter(uri, *, plugin=None, extension=None, format_hint=None, **kwargs):
+        if dtype is not None and _takes_argument(img_file, img_file.read, "dtype"):
+            call_kwargs["dtype"] = dtype
+        image = img_file.read(**call_kwargs)
+
+    return _convert_image(image, dtype, value_scale, layout)
+
+
+def imiter(
+    uri,
+    *,
+    plugin=None,
+    extension=None,
+    format_hint=None,
+    dtype=None,
+    value_scale=None,
+    layout="HWC",
+    **kwargs,
+):
     """Read a sequence of ndimages from a URI.
 
     Returns an iterable that yields ndimages from the given URI. The exact
@@ -76,6 +210,13 @@ def imiter(uri, *, plugin=None, extension=None, format_hint=None, **kwargs):
         extension. This affects the order in which backends are considered.
     format_hint : str
         Deprecated. Use `extension` instead.
+    dtype : {str, np.dtype, None}
+        If not None, cast each ndimage to this dtype. See :func:`imread`.
+    value_scale : {float, None}
+        If not None, multiply the pixel values of each ndimage by this value.
+        See :func:`imread`.
+    layout : {"HWC", "CHW"}
+        The order of the last three axes of each ndimage. See :func:`imread`.
     **kwargs :
         Additional keyword arguments will be passed to the plugin's ``iter``
         call.
@@ -87,6 +228,8 @@ def imiter(uri, *, plugin=None, extension=None, format_hint=None, **kwargs):
 
     """
 
+    _check_layout(layout)
+
     with imopen(
         uri,
         "r",
@@ -95,10 +238,12 @@ def imiter(uri, *, plugin=None, extension=None, format_hint=None, **kwargs):
         format_hint=format_hint,
         extension=extension,
     ) as img_file:
+        if dtype is not None and _takes_argument(img_file, img_file.iter, "dtype"):
+            kwargs["dtype"] = dtype
         for image in img_file.iter(**kwargs):
             # Note: casting to ndarray here to ensure compatibility
             # with the v2.9 API
-            yield np.asarray(image)
+            yield _convert_image(image, dtype, value_scale, layout)
 
 
 def imwrite(uri, image, *, plugin=None, extension=None, format_hint=None, **kwargs):
@@ -149,7 +294,17 @@ def imwrite(uri, image, *, plugin=None, extension=None, format_hint=None, **kwar
     return encoded
 
 
-def improps(uri, *, index=None, plugin=None, extension=None, **kwargs):
+def improps(
+    uri,
+    *,
+    index=None,
+    plugin=None,
+    extension=None,
+    dtype=None,
+    value_scale=None,
+    layout="HWC",
+    **kwargs,
+):
     """Read standardized metadata.
 
     Opens the given URI and reads the properties of an ndimage from it. The
@@ -173,6 +328,15 @@ def improps(uri, *, index=None, plugin=None, extension=None, **kwargs):
     extension : str
         If not None, treat the provided ImageResource as if it had the given
         extension. This affects the order in which backends are considered.
+    dtype : {str, np.dtype, None}
+        Report the properties of an ndimage read with this dtype. See
+        :func:`imread`.
+    value_scale : {float, None}
+        Report the properties of an ndimage read with this value_scale. See
+        :func:`imread`.
+    layout : {"HWC", "CHW"}
+        Report the properties of an ndimage read with this layout. See
+        :func:`imread`.
     **kwargs :
         Additional keyword arguments will be passed to the plugin's ``properties``
         call.
@@ -198,10 +362,16 @@ def improps(uri, *, index=None, plugin=None, extension=None, **kwargs):
     if index is not None:
         call_kwargs["index"] = index
 
+    _check_layout(layout)
+
     with imopen(uri, "r", **plugin_kwargs) as img_file:
         properties = img_file.properties(**call_kwargs)
 
-    return properties
+    return dataclasses.replace(
+        properties,
+        shape=_output_shape(properties.shape, layout),
+        dtype=_output_dtype(dtype, value_scale, properties.dtype),
+    )
 
 
 def immeta(
@@ -1,6 +1,7 @@
 from typing import Any, Dict, Iterator, List, Literal, Optional, Union, overload
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 from .core.imopen import imopen as imopen
 from .core.v3_plugin_api import ImageProperties
@@ -13,6 +14,9 @@ def imread(
     plugin: str = None,
     extension: str = None,
     format_hint: str = None,
+    dtype: DTypeLike = None,
+    value_scale: Optional[float] = None,
+    layout: Literal["HWC", "CHW"] = "HWC",
     **kwargs,
 ) -> np.ndarray: ...
 def imiter(
@@ -21,6 +25,9 @@ def imiter(
     plugin: str = None,
     extension: str = None,
     format_hint: str = None,
+    dtype: DTypeLike = None,
+    value_scale: Optional[float] = None,
+    layout: Literal["HWC", "CHW"] = "HWC",
     **kwargs,
 ) -> Iterator[np.ndarray]: ...
 @overload
@@ -49,6 +56,9 @@ def improps(
     index: Optional[int] = 0,
     plugin: str = None,
     extension: str = None,
+    dtype: DTypeLike = None,
+    value_scale: Optional[float] = None,
+    layout: Literal["HWC", "CHW"] = "HWC",
     **kwargs,
 ) -> ImageProperties: ...
 def immeta(
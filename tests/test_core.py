@@ -575,6 +575,34 @@ def test_util_image_as_uint():
         assert res[0] == tup[2][0] and res[1] == tup[2][1]
 
 
+@pytest.mark.filterwarnings("ignore:invalid value encountered in cast")
+def test_util_image_as_uint_chunked():
+    # Spans multiple chunks, with a NaN in one of them
+    im = np.linspace(-1, 3, 1000 * 1000, dtype="float32").reshape(1000, 1000)
+    im[700, 3] = np.nan
+    expected = np.round((im[:700] + 1) / 4 * 255)
+
+    res = core.image_as_uint(im, bitdepth=8)
+    assert res.dtype == np.uint8
+    assert np.abs(res[:700] - expected).max() <= 1
+    assert res[-1, -1] == 255
+
+    out = np.empty(im.shape, np.uint16)
+    assert core.image_as_uint(im, bitdepth=16, out=out) is out
+    assert out[0, 0] == 0 and out[-1, -1] == 65535
+
+    # Non-contiguous and 0D input
+    res = core.image_as_uint(np.arange(20.0)[::2] / 18, bitdepth=8)
+    assert np.array_equal(res, np.round(np.arange(10) / 9 * 255))
+    assert core.image_as_uint(np.array(0.5)) == 127
+
+    out = np.empty((2,), np.uint8)
+    assert core.image_as_uint(np.uint8([1, 2]), out=out) is out
+    assert np.array_equal(out, [1, 2])
+    raises(ValueError, core.image_as_uint, np.uint8([1, 2]), 16, out)
+    raises(ValueError, core.image_as_uint, np.zeros(3), out=out)
+
+
 def test_util_has_has_module():
     assert not core.has_module("this_module_does_not_exist")
     assert core.has_module("sys")
@@ -908,6 +936,53 @@ def test_imiter(test_images):
         assert np.allclose(full_image[idx, ...], im)
 
 
+def test_output_dtype_and_layout(tmp_path):
+    image = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+    iio.v3.imwrite(tmp_path / "foo.png", image)
+
+    result = iio.v3.imread(
+        tmp_path / "foo.png", dtype="float32", value_scale=1 / 255, layout="CHW"
+    )
+    expected = image.transpose(2, 0, 1).astype(np.float32) / 255
+    assert result.dtype == np.float32
+    assert result.flags.c_contiguous
+    assert np.allclose(result, expected)
+
+    props = iio.v3.improps(
+        tmp_path / "foo.png", dtype="float32", value_scale=1 / 255, layout="CHW"
+    )
+    assert props.shape == (3, 4, 5)
+    assert props.dtype == np.float32
+
+    # value_scale without dtype gives floats
+    assert iio.v3.imread(tmp_path / "foo.png", value_scale=2).dtype == np.float64
+    assert iio.v3.improps(tmp_path / "foo.png", value_scale=0.5).dtype == np.float64
+
+    # 2D images get a channel axis
+    gray = iio.v3.imread(tmp_path / "foo.png", mode="L", layout="CHW")
+    assert gray.shape == (1, 4, 5)
+
+    for frame in iio.v3.imiter(tmp_path / "foo.png", dtype="uint16", layout="CHW"):
+        assert frame.dtype == np.uint16
+        assert np.array_equal(frame, image.transpose(2, 0, 1))
+
+    with pytest.raises(ValueError):
+        iio.v3.imread(tmp_path / "foo.png", layout="WHC")
+
+
+def test_legacy_plugin_returns_ndarray(tmp_path):
+    image = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+    iio.v3.imwrite(tmp_path / "foo.png", image)
+
+    # legacy plugins return imageio.core.util.Array; v3 hands out plain ndarrays
+    result = iio.v3.imread(tmp_path / "foo.png", plugin="PNG-PIL")
+    assert type(result) is np.ndarray
+    assert np.array_equal(result, image)
+
+    for frame in iio.v3.imiter(tmp_path / "foo.png", plugin="PNG-PIL"):
+        assert type(frame) is np.ndarray
+
+
 def test_request_mode_backwards_compatibility():
     mode = Mode("ri")
     assert mode == "ri"
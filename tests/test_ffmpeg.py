@@ -3,6 +3,8 @@
 import gc
 import os
 import platform
+import queue
+import subprocess
 import sys
 import threading
 import time
@@ -520,6 +522,59 @@ def test_framecatcher():
     file.close()
 
 
+def test_framecatcher_wait():
+    frames = queue.Queue()
+
+    def fake_camera():
+        while True:
+            frame = frames.get()
+            if frame is None:
+                return
+            yield frame
+
+    T = imageio.plugins.ffmpeg.FrameCatcher(fake_camera())
+    with pytest.raises(TimeoutError):
+        T.get_frame(timeout=0.05)
+
+    frames.put(b"a")
+    assert T.get_frame(timeout=5) == (b"a", True)
+    assert T.get_frame(timeout=5) == (b"a", False)
+
+    # Wait for a new frame
+    with pytest.raises(TimeoutError):
+        T.get_frame(timeout=0.05, wait_for_new=True)
+    frames.put(b"b")
+    assert T.get_frame(timeout=5, wait_for_new=True) == (b"b", True)
+
+    # The last frame stays available when the stream ends
+    frames.put(None)
+    T.join(5)
+    assert not T.is_alive()
+    assert T.get_frame() == (b"b", False)
+    with pytest.raises(StopIteration):
+        T.get_frame(wait_for_new=True)
+    T.stop_me()
+
+
+def test_framecatcher_stop_stalled(caplog):
+    stalled = threading.Event()
+
+    def stalled_camera():
+        stalled.wait(5)
+        yield b"a"
+
+    T = imageio.plugins.ffmpeg.FrameCatcher(stalled_camera())
+    t0 = time.perf_counter()
+    T.stop_me(timeout=0.1)
+    assert time.perf_counter() - t0 < 2
+    assert T.is_alive()
+    assert "did not stop" in caplog.text
+
+    stalled.set()
+    T.join(5)
+    assert not T.is_alive()
+
+
 def test_webcam():
     good_paths = ["<video0>", "<video42>"]
     for path in good_paths:
@@ -718,3 +773,205 @@ def test_read_path_with_caret(test_images, tmp_path):
     shutil.copy(test_images / "cockatoo.mp4", tmp_path / "^cockatoo.mp4")
     video = iio3.imopen(tmp_path / "^cockatoo.mp4", "r", plugin="FFMPEG")
     assert video.metadata() is not None
+
+
+def test_read_into_buffers(tmp_path, monkeypatch):
+    fname = tmp_path / "test_vid.mp4"
+    with iio.get_writer(fname) as W:
+        for i in range(20):
+            W.append_data(np.full((48, 64, 3), 10 * i, np.uint8))
+
+    popen = subprocess.Popen
+    commands = []
+
+    def counting_popen(cmd, *args, **kwargs):
+        commands.append(cmd)
+        return popen(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", counting_popen)
+    with iio.get_reader(fname) as R:
+        # frames come from a subprocess that the reader owns, which also
+        # provides the meta data
+        assert isinstance(R._pipe, imageio.plugins.ffmpeg.FramePipe)
+        assert R._read_gen is None
+        assert R.get_meta_data()["size"] == (64, 48)
+        assert len(commands) == 1
+        monkeypatch.undo()
+
+        expected = [R.get_data(i) for i in range(20)]
+        assert expected[0].flags.writeable
+        assert not np.shares_memory(expected[0], expected[1])
+
+        # skipping ahead and seeking back still yields the same frames
+        assert np.array_equal(R.get_data(12), expected[12])
+        assert np.array_equal(R.get_data(3), expected[3])
+
+    with iio.get_reader(fname, buffers=2) as R:
+        frame0 = R.get_data(0)
+        frame1 = R.get_data(1)
+        assert np.array_equal(frame0, expected[0])
+        assert np.array_equal(frame1, expected[1])
+
+        # the ring of buffers is reused
+        frame2 = R.get_data(2)
+        assert np.shares_memory(frame0, frame2)
+        assert not np.shares_memory(frame1, frame2)
+        assert np.array_equal(frame0, expected[2])
+
+        for i in range(3, 20):
+            assert np.array_equal(R.get_data(i), expected[i])
+        with pytest.raises(IndexError):
+            R.get_data(20)
+
+    with pytest.raises(ValueError):
+        iio.get_reader(fname, buffers=0)
+
+    # a truncated stream reports ffmpeg's error output
+    pipe = imageio.plugins.ffmpeg.FramePipe(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-i", str(fname), "-f", "null", "-"]
+    )
+    error = pipe.frame_error(10, 20)
+    pipe.close()
+    assert "Frame is 10 bytes, but expected 20." in str(error)
+    assert "=== stderr ===" in str(error)
+
+
+@pytest.mark.parametrize("buffers", [None, 5])
+def test_prefetch(tmp_path, buffers):
+    fname = tmp_path / "test_vid.mp4"
+    with iio.get_writer(fname) as W:
+        for i in range(20):
+            W.append_data(np.full((48, 64, 3), 10 * i, np.uint8))
+    expected = [frame for frame in iio.get_reader(fname)]
+
+    with iio.get_reader(fname, prefetch=3, buffers=buffers) as R:
+        prefetcher = R._prefetcher
+        assert prefetcher.is_alive()
+        for i in [0, 1, 2, 15, 16, 4, 19]:
+            assert np.array_equal(R.get_data(i), expected[i])
+        with pytest.raises(IndexError):
+            R.get_data(20)
+    assert not prefetcher.is_alive()
+    assert R._prefetcher is None
+
+    with pytest.raises(ValueError):
+        iio.get_reader(fname, prefetch=3, buffers=4)
+
+
+def test_prefetcher_stop():
+    counter = iter(range(1000))
+    T = imageio.plugins.ffmpeg.FramePrefetcher(lambda: next(counter), 2)
+    assert T.get_frame() == 0
+
+    # the worker waits for room in the queue, and stops when asked
+    t0 = time.perf_counter()
+    T.stop_me(timeout=5)
+    assert not T.is_alive()
+    assert time.perf_counter() - t0 < 1
+    assert next(counter) <= 4
+
+
+def test_seek_model(tmp_path):
+    fname = tmp_path / "test_vid.mp4"
+    output_params = ["-g", "10", "-sc_threshold", "0"]
+    with iio.get_writer(fname, fps=25, output_params=output_params) as W:
+        for i in range(100):
+            W.append_data(np.full((48, 64, 3), 2 * i, np.uint8))
+    expected = [frame for frame in iio.get_reader(fname)]
+
+    keyframe_times = imageio.plugins.ffmpeg._scan_keyframe_times(str(fname))
+    assert np.allclose(keyframe_times, np.arange(10) * 0.4)
+
+    with iio.get_reader(fname) as R:
+        restarts = []
+        initialize = R._initialize
+        R._initialize = lambda index=0: (restarts.append(index), initialize(index))
+
+        assert np.array_equal(R.get_data(0), expected[0])
+        assert R._frame_time > 0
+        assert R._startup_time > 0
+
+        # within the slow seek range, seeking decodes more frames than
+        # reading forward, so ffmpeg is not restarted
+        assert not R._seek_is_faster(99)
+        assert R._seek_frames(99) > 98
+        assert np.array_equal(R.get_data(99), expected[99])
+        assert restarts == []
+
+        assert np.array_equal(R.get_data(50), expected[50])
+        assert restarts == [50]
+
+        # the frame count is cached
+        assert R.count_frames() == 100
+        cache = imageio.plugins.ffmpeg._get_probe_cache(R._filename)
+        assert cache["nframes"] == 100
+        assert "keyframe_times" in cache
+
+
+def test_seek_back_without_scan(tmp_path):
+    fname = tmp_path / "test_vid.mp4"
+    with iio.get_writer(fname, fps=25) as W:
+        for i in range(30):
+            W.append_data(np.full((48, 64, 3), 2 * i, np.uint8))
+
+    with iio.get_reader(fname) as R:
+        frames = [R.get_data(i) for i in range(5)]
+        assert np.array_equal(R.get_data(2), frames[2])
+
+        # seeking back doesn't scan the file for keyframes
+        cache = imageio.plugins.ffmpeg._get_probe_cache(R._filename)
+        assert "keyframe_times" not in cache
+
+
+def test_writer_queue_and_batch(tmp_path):
+    frames = np.zeros((20, 48, 64, 3), np.uint8)
+    frames += np.arange(20, dtype=np.uint8)[:, None, None, None] * 10
+
+    with iio.get_writer(tmp_path / "sync.mp4", macro_block_size=1) as W:
+        for frame in frames:
+            W.append_data(frame)
+    expected = np.stack([frame for frame in iio.get_reader(tmp_path / "sync.mp4")])
+
+    # The frames are copied, so the buffer can be reused right away
+    fname = tmp_path / "queued.mp4"
+    buffer = np.empty_like(frames[0])
+    with iio.get_writer(fname, macro_block_size=1, queue_size=4) as W:
+        for frame in frames:
+            buffer[:] = frame
+            W.append_data(buffer)
+    assert np.array_equal(
+        np.stack([frame for frame in iio.get_reader(fname)]), expected
+    )
+
+    fname = tmp_path / "batch.mp4"
+    with iio.get_writer(fname, macro_block_size=1) as W:
+        W.append_data(frames[:5])
+        W.append_data(frames[5:])
+    assert np.array_equal(
+        np.stack([frame for frame in iio.get_reader(fname)]), expected
+    )
+
+    # Write errors surface in the calling thread
+    with pytest.raises(IOError):
+        with iio.get_writer(tmp_path / "error.mp4", codec="foo", queue_size=2) as W:
+            for i in range(50):
+                W.append_data(frames[0])
+
+
+def test_v3_dtype(tmp_path):
+    fname = tmp_path / "test_vid.mp4"
+    with iio.get_writer(fname) as W:
+        for i in range(10):
+            W.append_data(np.full((48, 64, 3), 25 * i, np.uint8))
+
+    # the legacy reader's own dtype decodes at 16 bit
+    frame = iio3.imread(fname, plugin="FFMPEG", index=5, dtype="uint16")
+    with iio3.imopen(fname, "r", plugin="FFMPEG") as file:
+        expected = file.read(index=5, dtype="uint16")
+    assert frame.dtype == np.uint16
+    assert frame.max() > 255
+    assert np.array_equal(frame, expected)
+
+    for frame in iio3.imiter(fname, plugin="FFMPEG", dtype="uint16"):
+        assert frame.dtype == np.uint16
+    assert frame.max() > 255
@@ -770,3 +770,189 @@ def test_webp_remote():
     url = "https://github.com/python-pillow/Pillow/raw/main/Tests/images/hopper_orientation_2.webp"
     im = iio.imread(url, plugin="pillow")
     assert im.shape == (128, 128, 3)
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected_shape",
+    [
+        ({"reduce": 2}, (121, 161, 3)),
+        ({"reduce": 3}, (81, 107, 3)),
+        ({"reduce": 8}, (31, 41, 3)),
+        ({"size": (64, 32)}, (32, 64, 3)),
+    ],
+)
+@pytest.mark.parametrize("extension", [".jpg", ".png"])
+def test_reduced_read(extension, kwargs, expected_shape):
+    rng = np.random.default_rng()
+    img = rng.integers(0, 255, (241, 321, 3), dtype=np.uint8)
+    buffer = iio.imwrite("<bytes>", img, extension=extension)
+
+    with iio.imopen(buffer, "r", plugin="pillow") as file:
+        reduced = file.read(**kwargs)
+        assert reduced.shape == expected_shape
+        assert file.properties(**kwargs).shape == expected_shape
+
+        # the full-resolution image is unaffected
+        assert file.read().shape == img.shape
+
+
+def test_reduced_read_jpeg_draft():
+    img = np.zeros((256, 256, 3), dtype=np.uint8)
+    img[:, 128:] = 255
+    buffer = iio.imwrite("<bytes>", img, extension=".jpg")
+
+    expected = np.asarray(Image.open(io.BytesIO(buffer)).reduce(4))
+    actual = iio.imread(buffer, plugin="pillow", reduce=4)
+
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=8)
+
+
+def test_reduced_read_batch():
+    rng = np.random.default_rng()
+    img = rng.integers(0, 255, (3, 20, 30, 3), dtype=np.uint8)
+    buffer = iio.imwrite("<bytes>", img, extension=".gif")
+
+    assert iio.imread(buffer, plugin="pillow", reduce=2).shape == (3, 10, 15, 3)
+    assert iio.improps(buffer, plugin="pillow", reduce=2).shape == (3, 10, 15, 3)
+
+
+def test_reduced_read_invalid():
+    img = np.zeros((16, 16, 3), dtype=np.uint8)
+    buffer = iio.imwrite("<bytes>", img, extension=".png")
+
+    with pytest.raises(ValueError):
+        iio.imread(buffer, plugin="pillow", size=(4, 4), reduce=2)
+
+    with pytest.raises(ValueError):
+        iio.imread(buffer, plugin="pillow", reduce=0)
+
+
+def test_gif_streaming_write(tmp_path):
+    rng = np.random.default_rng()
+    frames = rng.integers(0, 255, (10, 64, 48, 3), dtype=np.uint8)
+
+    with iio.imopen(tmp_path / "test.gif", "w", plugin="pillow") as file:
+        for frame in frames:
+            file.write(frame, streaming=True, mode="RGB", duration=40, loop=0)
+            # frames are encoded right away instead of being buffered
+            assert len(file.images_to_write) == 0
+
+    expected = iio.imread(
+        iio.imwrite(
+            "<bytes>",
+            frames,
+            extension=".gif",
+            plugin="pillow",
+            mode="RGB",
+            duration=40,
+            loop=0,
+        ),
+        plugin="pillow",
+        mode="RGB",
+    )
+    actual = iio.imread(tmp_path / "test.gif", plugin="pillow", mode="RGB")
+    assert np.array_equal(actual, expected)
+
+    meta = iio.immeta(tmp_path / "test.gif", plugin="pillow")
+    assert meta["loop"] == 0
+    assert meta["duration"] == 40
+
+
+def test_gif_streaming_shared_palette():
+    rng = np.random.default_rng()
+    base = rng.integers(0, 4, (32, 32), dtype=np.uint8) * 60
+    frames = np.stack([np.roll(base, idx, axis=1) for idx in range(6)])
+
+    buffer = iio.imwrite(
+        "<bytes>", frames, extension=".gif", plugin="pillow", streaming=True
+    )
+
+    actual = iio.imread(buffer, plugin="pillow", mode="L")
+    assert np.array_equal(actual, frames)
+
+    # frames reuse the global color table; no local color table flag is set
+    descriptor = b"\x2c\x00\x00\x00\x00\x20\x00\x20\x00"
+    flags = buffer.split(descriptor)[1:]
+    assert len(flags) == 6
+    assert all(chunk[0] & 0x80 == 0 for chunk in flags)
+
+
+def test_gif_streaming_duplicate_frames():
+    rng = np.random.default_rng()
+    frames = rng.integers(0, 255, (5, 32, 32), dtype=np.uint8)
+    frames[2] = frames[1]
+
+    buffer = iio.imwrite(
+        "<bytes>",
+        frames,
+        extension=".gif",
+        streaming=True,
+        duration=[10, 20, 30, 40, 50],
+    )
+
+    actual = iio.imread(buffer, plugin="pillow", mode="L")
+    assert np.array_equal(actual, frames[[0, 1, 3, 4]])
+
+    durations = [
+        iio.immeta(buffer, index=idx, plugin="pillow")["duration"] for idx in range(4)
+    ]
+    assert durations == [10, 50, 40, 50]
+
+
+def test_streaming_unsupported_format():
+    frames = np.zeros((3, 16, 16, 3), dtype=np.uint8)
+
+    with pytest.warns(UserWarning):
+        buffer = iio.imwrite("<bytes>", frames, extension=".png", streaming=True)
+
+    assert iio.imread(buffer, index=...).shape == frames.shape
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_gif_global_palette(streaming):
+    rng = np.random.default_rng()
+    frames = rng.integers(0, 255, (8, 32, 48, 3), dtype=np.uint8)
+
+    buffer = iio.imwrite(
+        "<bytes>",
+        frames,
+        extension=".gif",
+        global_palette=True,
+        bits=4,
+        streaming=streaming,
+    )
+
+    # every frame only uses colors from one 16-color palette
+    actual = iio.imread(buffer, plugin="pillow")
+    assert actual.shape == frames.shape
+    assert len(np.unique(actual.reshape(-1, 3), axis=0)) <= 16
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_gif_global_palette_grayscale(streaming):
+    ramp = np.linspace(0, 255, 48).astype(np.uint8)
+    frames = np.stack([np.tile(np.roll(ramp, 5 * i), (32, 1)) for i in range(8)])
+
+    buffer = iio.imwrite(
+        "<bytes>", frames, extension=".gif", global_palette=True, streaming=streaming
+    )
+
+    actual = iio.imread(buffer, plugin="pillow", index=..., mode="L")
+    assert actual.shape == frames.shape
+    assert np.abs(actual.astype(int) - frames).mean() < 2
+
+
+def test_gif_parallel_quantization():
+    rng = np.random.default_rng()
+    frames = rng.integers(0, 255, (8, 32, 48, 3), dtype=np.uint8)
+
+    expected = iio.imwrite("<bytes>", frames, extension=".gif", bits=4)
+    actual = iio.imwrite("<bytes>", frames, extension=".gif", bits=4, workers=4)
+    assert actual == expected
+
+    expected = iio.imwrite("<bytes>", frames, extension=".gif", global_palette=True)
+    actual = iio.imwrite(
+        "<bytes>", frames, extension=".gif", global_palette=True, workers=4
+    )
+    assert actual == expected
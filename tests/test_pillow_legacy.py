@@ -12,6 +12,10 @@ import imageio
 from imageio import core
 from conftest import deprecated_test
 
+# pillowmulti can only be imported after pillow_legacy (circular import)
+from imageio.plugins.pillow_legacy import PillowFormat  # noqa: F401
+from imageio.plugins.pillowmulti import GifWriter
+
 
 @deprecated_test
 def setup_module():
@@ -511,3 +515,130 @@ def test_write_jpg_to_bytes_io():
 
     image_from_file = imageio.imread(bytes_io)
     assert np.allclose(image_from_file, image)
+
+
+@pytest.mark.parametrize("subrectangles", [False, True])
+@deprecated_test
+def test_gif_writer_duplicate_frames(subrectangles):
+    rng = np.random.default_rng()
+    base = rng.integers(0, 255, (40, 50, 3), dtype=np.uint8)
+    ims = list()
+    for idx in range(6):
+        im = base.copy()
+        im[10:20, 5:15] = (idx // 2) * 40
+        ims.append(im)
+
+    bytes_io = io.BytesIO()
+    writer = GifWriter(bytes_io, subrectangles, 0, 0, 256)
+    for im in ims:
+        writer.add_image(im, 0.1, 1 if subrectangles else 2)
+    writer.close()
+
+    # pairs of identical images are stored as one frame of twice the duration
+    encoded = bytes_io.getvalue()
+    frames = imageio.v3.imread(encoded, plugin="pillow", index=...)
+    assert frames.shape == (3, 40, 50, 3)
+    for idx in range(3):
+        assert np.array_equal(frames[idx, 10:20, 5:15], ims[2 * idx][10:20, 5:15])
+
+    meta = imageio.v3.immeta(encoded, plugin="pillow", index=2)
+    assert meta["duration"] == 200
+
+
+@deprecated_test
+def test_gif_writer_changed_box():
+    writer = GifWriter(io.BytesIO())
+    writer._count = 1
+    writer._previous_image = np.full((4, 5, 3), 3, dtype=np.uint8)
+
+    im = writer._previous_image.copy()
+    assert writer.getChangedBox(im) is None
+
+    # a decrease must not wrap around
+    im[1, 2, 0] = 2
+    im[2, 3, 2] = 250
+    assert writer.getChangedBox(im) == (2, 1, 4, 3)
+
+    sub_im, xy = writer.getSubRectangle(im)
+    assert xy == (2, 1)
+    assert sub_im.shape == (2, 2, 3)
+
+
+@pytest.mark.parametrize("subrectangles", [False, True])
+@deprecated_test
+def test_gif_writer_workers_and_global_palette(subrectangles):
+    rng = np.random.default_rng()
+    base = rng.integers(0, 255, (40, 50, 3), dtype=np.uint8)
+    ims = list()
+    for idx in range(8):
+        im = base.copy()
+        im[10:20, 5 + idx : 15 + idx] = idx * 30
+        ims.append(im)
+
+    def encode(**kwargs):
+        bytes_io = io.BytesIO()
+        imageio.mimwrite(
+            bytes_io, ims, format="GIF-PIL", subrectangles=subrectangles, **kwargs
+        )
+        return bytes_io.getvalue()
+
+    # quantizing in threads doesn't change the result
+    assert encode(workers=3) == encode()
+
+    encoded = encode(global_palette=True)
+    assert encoded == encode(global_palette=True, workers=3)
+
+    frames = imageio.v3.imread(encoded, plugin="pillow", index=..., mode="RGB")
+    assert frames.shape == (8, 40, 50, 3)
+    for frame, im in zip(frames, ims):
+        assert np.abs(frame.astype(int) - im).mean() < 20
+
+    # no frame has a local color table
+    assert _gif_local_color_tables(encoded) == [False] * 8
+
+
+@deprecated_test
+@pytest.mark.parametrize("subrectangles", [False, True])
+def test_gif_writer_mixed_shapes(subrectangles):
+    gray = np.full((40, 50), 100, dtype=np.uint8)
+    rgb = np.zeros((40, 50, 3), dtype=np.uint8)
+    rgb[..., 0] = 200
+    small = np.full((20, 30, 3), 50, dtype=np.uint8)
+
+    bytes_io = io.BytesIO()
+    imageio.mimwrite(
+        bytes_io, [gray, rgb, rgb, small], format="GIF-PIL", subrectangles=subrectangles
+    )
+
+    # frames that can't be compared to the previous one are written as-is
+    frames = imageio.v3.imread(
+        bytes_io.getvalue(), plugin="pillow", index=..., mode="RGB"
+    )
+    assert frames.shape == (3, 40, 50, 3)
+    assert np.all(frames[0] == 100)
+    assert np.all(frames[1] == (200, 0, 0))
+    assert np.all(frames[2, :20, :30] == 50)
+
+
+def _gif_local_color_tables(data):
+    # walk the blocks of a GIF and report, per image, if it has a local
+    # color table
+
+    def skip_sub_blocks(pos):
+        while data[pos] != 0:
+            pos += data[pos] + 1
+        return pos + 1
+
+    flags = data[10]
+    pos = 13 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+
+    result = []
+    while data[pos] != 0x3B:
+        if data[pos] == 0x21:  # extension
+            pos = skip_sub_blocks(pos + 2)
+        else:  # image descriptor
+            flags = data[pos + 9]
+            result.append(bool(flags & 0x80))
+            pos += 10 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+            pos = skip_sub_blocks(pos + 1)  # after the LZW minimum code size
+    return result
@@ -3,6 +3,7 @@ import io
 import multiprocessing
 import warnings
 from contextlib import ExitStack
+from fractions import Fraction
 from pathlib import Path
 
 import numpy as np
@@ -15,7 +16,7 @@ av = pytest.importorskip("av", reason="pyAV is not installed.")
 
 from av.video.format import names as video_format_names  # type: ignore # noqa: E402
 
-from imageio.plugins.pyav import _format_to_dtype  # noqa: E402
+from imageio.plugins.pyav import _INDEX_CACHE, _format_to_dtype  # noqa: E402
 
 AV_VERSION = tuple(int(x) for x in av.__version__.split("."))
 
@@ -25,6 +26,31 @@ if IS_PYPY:
     pytest.skip("pyAV sometimes causes segfaults on Pypy.", allow_module_level=True)
 
 
+def make_video(path, n_frames=60, *, gop_size=10, variable_fps=False):
+    """Write a small h264 video in which every frame is distinct."""
+
+    with av.open(str(path), "w") as container:
+        stream = container.add_stream("libx264", rate=25)
+        stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+        stream.gop_size = gop_size
+        stream.codec_context.time_base = Fraction(1, 1000)
+
+        pts = 0
+        for idx in range(n_frames):
+            image = np.zeros((48, 64, 3), dtype=np.uint8)
+            image[..., 0] = (idx * 4) % 256
+            image[:8, : idx % 64 + 1, 1] = 255
+
+            frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+            frame.pts, frame.time_base = pts, Fraction(1, 1000)
+            pts += (20, 40, 73)[idx % 3] if variable_fps else 40
+
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode())
+
+    return path
+
+
 def test_mp4_read(test_images: Path):
     with av.open(str(test_images / "cockatoo.mp4"), "r") as container:
         for idx, frame in enumerate(container.decode(video=0)):
@@ -624,3 +650,402 @@ def test_lagging_video_stream(test_images):
     if not output.poll(timeout=5):
         proc.kill()
         raise TimeoutError("Test Subprocess failed to respond in time.")
+
+
+@pytest.mark.parametrize(
+    "name,variable_fps", [("cfr.mp4", False), ("vfr.mkv", True), ("cfr.mkv", False)]
+)
+def test_indexed_seek(tmp_path, name, variable_fps):
+    video = make_video(tmp_path / name, variable_fps=variable_fps)
+    expected = iio.imread(video, plugin="pyav")
+
+    rng = np.random.default_rng(42)
+    indices = [59, 0, 58, 10, 9, 11, 30, 29, 1] + rng.permutation(60).tolist()
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        for idx in indices:
+            actual = file.read(index=idx)
+            assert np.array_equal(actual, expected[idx]), idx
+
+        with pytest.raises(IndexError):
+            file.read(index=60)
+
+
+def test_index_sidecar(tmp_path):
+    video = make_video(tmp_path / "video.mp4")
+    sidecar = tmp_path / "video.mp4.pyav-index.npz"
+    expected = iio.imread(video, plugin="pyav", index=42)
+
+    actual = iio.imread(video, plugin="pyav", index=42, constant_framerate=False)
+    assert np.array_equal(actual, expected)
+    assert not sidecar.exists()
+
+    _INDEX_CACHE.clear()
+    with iio.imopen(video, "r", plugin="pyav", index_sidecar=True) as file:
+        actual = file.read(index=42)
+    assert np.array_equal(actual, expected)
+    assert sidecar.exists()
+
+    # the sidecar is used instead of demuxing the file again
+    _INDEX_CACHE.clear()
+    with iio.imopen(video, "r", plugin="pyav", index_sidecar=True) as file:
+        packet_index = file._get_packet_index(build=False)
+        assert packet_index is not None
+        assert len(packet_index) == 60
+        assert packet_index.is_keyframe[0]
+        assert np.sum(packet_index.is_keyframe) >= 6
+
+
+def test_batched_read(tmp_path):
+    video = make_video(tmp_path / "video.mp4")
+    expected = iio.imread(video, plugin="pyav")
+
+    indices = [42, 3, 17, 3, 59, 0, -1]
+    actual = iio.imread(video, plugin="pyav", index=indices)
+    assert actual.shape == (7, 48, 64, 3)
+    assert np.array_equal(actual, expected[indices])
+
+    actual = iio.imread(video, plugin="pyav", index=np.array([5, 4]))
+    assert np.array_equal(actual, expected[[5, 4]])
+
+    actual = iio.imread(video, plugin="pyav", index=slice(2, None, 7))
+    assert np.array_equal(actual, expected[2::7])
+
+    actual = iio.imread(video, plugin="pyav", index=[])
+    assert actual.shape == (0, 48, 64, 3)
+
+    with pytest.raises(IndexError):
+        iio.imread(video, plugin="pyav", index=[3, 60])
+
+
+def test_skip_frame(tmp_path):
+    video = make_video(tmp_path / "video.mp4")
+    expected = iio.imread(video, plugin="pyav")
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        keyframes = list(file.iter(skip_frame="NONKEY", return_frame_info=True))
+        assert 6 <= len(keyframes) < 60
+        for frame, info in keyframes:
+            assert info["key_frame"]
+            assert np.array_equal(frame, expected[info["index"]])
+
+        # decoding all frames again after skipping some
+        assert np.array_equal(file.read(index=13), expected[13])
+
+        with pytest.raises(ValueError):
+            file.read(index=13, skip_frame="NONKEY")
+
+    actual = iio.imread(video, plugin="pyav", skip_frame="NONKEY")
+    assert len(actual) == len(keyframes)
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        for frame, info in file.iter(skip_frame="NONREF", return_frame_info=True):
+            assert np.array_equal(frame, expected[info["index"]])
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        indices = [info["index"] for _, info in file.iter(return_frame_info=True)]
+    assert indices == list(range(60))
+
+
+def test_scaled_read(tmp_path):
+    video = make_video(tmp_path / "video.mp4")
+
+    props = iio.improps(video, plugin="pyav", size=(32, 16))
+    assert props.shape[1:] == (16, 32, 3)
+    props = iio.improps(video, plugin="pyav", scale=0.5, format="gray")
+    assert props.shape[1:] == (24, 32)
+
+    frame = iio.imread(video, plugin="pyav", index=5, size=(32, 16))
+    assert frame.shape == (16, 32, 3)
+
+    frames = iio.imread(video, plugin="pyav", scale=0.5, interpolation="AREA")
+    assert frames.shape == (60, 24, 32, 3)
+    assert np.array_equal(
+        frames[5],
+        iio.imread(video, plugin="pyav", index=5, scale=0.5, interpolation="AREA"),
+    )
+
+    frames = iio.imread(video, plugin="pyav", index=[7, 2], size=(20, 10))
+    assert frames.shape == (2, 10, 20, 3)
+
+    full = iio.imread(video, plugin="pyav", index=5)
+    same = iio.imread(video, plugin="pyav", index=5, size=(64, 48))
+    assert np.array_equal(full, same)
+
+    with pytest.raises(ValueError):
+        iio.imread(video, plugin="pyav", index=5, size=(32, 16), scale=0.5)
+
+
+def test_value_scale_and_resize_scale(tmp_path):
+    # v3's value_scale multiplies pixel values; pyav's scale resizes frames
+    video = make_video(tmp_path / "video.mp4")
+    expected = iio.imread(video, plugin="pyav")
+
+    frames = iio.imread(video, plugin="pyav", value_scale=1 / 255, dtype="float32")
+    assert frames.shape == expected.shape
+    assert frames.dtype == np.float32
+    assert 0 <= frames.min() and frames.max() <= 1
+    assert np.allclose(frames, expected / 255)
+
+    frames = iio.imread(
+        video, plugin="pyav", scale=0.5, value_scale=1 / 255, dtype="float32"
+    )
+    assert frames.shape == (60, 24, 32, 3)
+    assert frames.dtype == np.float32
+    assert 0 <= frames.min() and frames.max() <= 1
+
+    props = iio.improps(video, plugin="pyav", scale=0.5, value_scale=1 / 255)
+    assert props.shape == (60, 24, 32, 3)
+    assert props.dtype == np.float64
+
+
+@pytest.mark.parametrize("format", ["rgb24", "yuv444p", "gray"])
+def test_iter_out_buffers(tmp_path, format):
+    video = make_video(tmp_path / "video.mp4")
+    expected = iio.imread(video, plugin="pyav", format=format)
+
+    buffer_ids = set()
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        for idx, frame in enumerate(file.iter(format=format, out_buffers=3)):
+            assert np.array_equal(frame, expected[idx])
+            buffer_ids.add(id(frame))
+
+    assert idx == 59
+    assert len(buffer_ids) == 3
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        with pytest.raises(ValueError):
+            next(file.iter(out_buffers=0))
+
+
+def test_bulk_read_unknown_length(tmp_path):
+    # MKV doesn't store the number of frames in the stream
+    video = make_video(tmp_path / "video.mkv")
+    with av.open(str(video)) as container:
+        assert container.streams.video[0].frames == 0
+
+    expected = np.stack(list(iio.imiter(video, plugin="pyav")))
+    actual = iio.imread(video, plugin="pyav")
+    assert np.array_equal(actual, expected)
+
+    actual = iio.imread(video, plugin="pyav", filter_sequence=[("fps", "50")])
+    assert actual.shape == (120, 48, 64, 3)
+
+    actual = iio.imread(video, plugin="pyav", filter_sequence=[("scale", "32:16")])
+    assert actual.shape == (60, 16, 32, 3)
+
+
+def test_filter_graph_reuse(tmp_path):
+    video = make_video(tmp_path / "video.mp4")
+    filter_sequence = [("crop", "32:24:8:8"), ("scale", "16:12")]
+    expected = iio.imread(video, plugin="pyav", filter_sequence=filter_sequence)
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        file.read(index=10, filter_sequence=filter_sequence)
+        video_filter = file._video_filter
+
+        for idx in range(11, 20):
+            actual = file.read(index=idx, filter_sequence=filter_sequence)
+            assert np.array_equal(actual, expected[idx])
+        assert file._video_filter is video_filter
+
+        # seeking resets the filter
+        actual = file.read(index=45, filter_sequence=filter_sequence)
+        assert np.array_equal(actual, expected[45])
+        assert file._video_filter is not video_filter
+
+        actual = file.read(index=[50, 3], filter_sequence=filter_sequence)
+        assert np.array_equal(actual, expected[[50, 3]])
+
+        actual = file.read(index=4)
+        assert actual.shape == (48, 64, 3)
+        assert file._video_filter is None
+
+
+def test_frame_count(tmp_path):
+    video = make_video(tmp_path / "video.mkv", variable_fps=True)
+
+    props = iio.improps(video, plugin="pyav")
+    assert props.shape == (60, 48, 64, 3)
+    assert props.n_images == 60
+
+    props = iio.improps(video, plugin="pyav", exact=True)
+    assert props.n_images == 60
+
+    # without counting the number is estimated from the duration
+    props = iio.improps(video, plugin="pyav", exact=False)
+    assert props.n_images > 0
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        frames = file.iter()
+        first = next(frames)
+        assert file.properties(exact=True).n_images == 60
+
+        # counting doesn't change the read position
+        second = next(frames)
+        assert not np.array_equal(first, second)
+        assert np.array_equal(second, iio.imread(video, plugin="pyav", index=1))
+
+
+def test_frame_count_during_iteration(tmp_path):
+    video = make_video(tmp_path / "video.mkv", variable_fps=True)
+    expected = iio.imread(video, plugin="pyav")
+
+    # counting the frames of bytes uses a separate container
+    with iio.imopen(video.read_bytes(), "r", plugin="pyav") as file:
+        frames = file.iter()
+        for idx in range(5):
+            assert np.array_equal(next(frames), expected[idx])
+        assert file.properties().n_images == 60
+        assert np.array_equal(next(frames), expected[5])
+
+    # file objects are estimated instead of rewinding them
+    with open(video, "rb") as stream:
+        with iio.imopen(stream, "r", plugin="pyav") as file:
+            frames = file.iter()
+            for idx in range(5):
+                assert np.array_equal(next(frames), expected[idx])
+            assert file.properties().n_images > 0
+            assert np.array_equal(next(frames), expected[5])
+
+
+@pytest.mark.parametrize("workers", [2, 3, 16])
+def test_parallel_read(tmp_path, workers):
+    video = make_video(tmp_path / "video.mp4")
+    expected = iio.imread(video, plugin="pyav")
+
+    actual = iio.imread(video, plugin="pyav", workers=workers)
+    assert np.array_equal(actual, expected)
+
+    actual = iio.imread(video.read_bytes(), plugin="pyav", workers=workers)
+    assert np.array_equal(actual, expected)
+
+    with open(video, "rb") as file:
+        # file objects can't be opened twice and are read sequentially
+        actual = iio.imread(file, plugin="pyav", workers=workers)
+    assert np.array_equal(actual, expected)
+
+    with pytest.raises(ValueError):
+        iio.imread(
+            video, plugin="pyav", workers=workers, filter_sequence=[("fps", "50")]
+        )
+
+
+def test_pipelined_writing():
+    frames = np.zeros((30, 48, 64, 3), dtype=np.uint8)
+    for idx in range(30):
+        frames[idx, ..., idx % 3] = 8 * idx
+
+    def write(**kwargs):
+        buffer = io.BytesIO()
+        with iio.imopen(buffer, "w", plugin="pyav", extension=".mp4") as file:
+            file.init_video_stream("libx264", **kwargs)
+            for frame in frames:
+                file.write_frame(frame)
+        return iio.imread(buffer.getvalue(), plugin="pyav")
+
+    expected = write()
+    assert expected.shape == frames.shape
+    assert np.allclose(expected, frames, atol=16)
+
+    actual = write(queue_size=2)
+    assert np.array_equal(actual, expected)
+
+    actual = write(queue_size=1, thread_count=2, thread_type="FRAME")
+    assert np.allclose(actual, frames, atol=16)
+
+    with pytest.raises(ValueError):
+        write(queue_size=0)
+
+
+def test_pipelined_writing_error(monkeypatch):
+    def failing_encode(self, av_frame):
+        raise RuntimeError("Encoding failed.")
+
+    buffer = io.BytesIO()
+    with pytest.raises(RuntimeError, match="Encoding failed."):
+        with iio.imopen(buffer, "w", plugin="pyav", extension=".mp4") as file:
+            file.init_video_stream("libx264", queue_size=1)
+            monkeypatch.setattr(type(file), "_encode_frame", failing_encode)
+            for _ in range(10):
+                file.write_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+
+
+def test_pipelined_writing_error_is_sticky(monkeypatch):
+    encoded = []
+
+    def failing_encode(self, av_frame):
+        encoded.append(av_frame)
+        raise RuntimeError("Encoding failed.")
+
+    file = iio.imopen(io.BytesIO(), "w", plugin="pyav", extension=".mp4")
+    file.init_video_stream("libx264", queue_size=1)
+    monkeypatch.setattr(type(file), "_encode_frame", failing_encode)
+
+    file.write_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    # the encoder stops, and every later write and close fails
+    file._encoder_thread.join(timeout=5)
+    assert not file._encoder_thread.is_alive()
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="Encoding failed."):
+            file.write_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="Encoding failed."):
+            file.close()
+    assert len(encoded) == 1
+
+
+def test_remux(tmp_path):
+    video = make_video(tmp_path / "video.mkv")
+    expected = iio.imread(video, plugin="pyav")
+
+    with iio.imopen(video, "r", plugin="pyav") as file:
+        encoded = file.remux("<bytes>", extension=".mp4")
+        assert np.array_equal(iio.imread(encoded, plugin="pyav"), expected)
+
+        # cuts are moved to keyframes
+        start, stop = file.cut_points(0.5, 1.5)
+        assert start <= 0.5 and 1.5 <= stop
+
+        file.remux(tmp_path / "clip.mp4", start=0.5, stop=1.5)
+        clip = iio.imread(tmp_path / "clip.mp4", plugin="pyav")
+        start_idx, stop_idx = round(start * 25), round(stop * 25)
+        assert np.array_equal(clip, expected[start_idx:stop_idx])
+
+        start, stop = file.cut_points(start=2)
+        assert stop is None
+
+        # remuxing doesn't break reading
+        assert np.array_equal(file.read(index=3), expected[3])
+
+
+def test_streaming_write(tmp_path):
+    frames = np.zeros((30, 48, 64, 3), dtype=np.uint8)
+    for idx in range(30):
+        frames[idx, ..., idx % 3] = 8 * idx
+
+    chunks = list()
+    with iio.imopen(
+        "<bytes>", "w", plugin="pyav", extension=".mp4", chunk_callback=chunks.append
+    ) as file:
+        file.init_video_stream("libx264", max_keyframe_interval=5)
+        for frame in frames:
+            file.write_frame(frame)
+
+        # fragments are passed on before the video is complete
+        n_chunks = len(chunks)
+        assert n_chunks > 1
+
+    assert len(chunks) > n_chunks
+    video = b"".join(chunks)
+    assert iio.imread(video, plugin="pyav").shape == frames.shape
+
+    # fragmented MP4 without streaming
+    with iio.imopen(
+        tmp_path / "video.mp4", "w", plugin="pyav", fragmented=True
+    ) as file:
+        file.write(frames, codec="libx264")
+
+    assert b"moof" in (tmp_path / "video.mp4").read_bytes()
+    actual = iio.imread(tmp_path / "video.mp4", plugin="pyav")
+    assert np.allclose(actual, frames, atol=16)
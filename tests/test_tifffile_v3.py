@@ -12,6 +12,8 @@ from imageio.config import known_plugins, known_extensions
 
 tifffile = pytest.importorskip("tifffile", reason="TiffFile is not installed")
 
+from imageio.plugins import tifffile_v3  # noqa: E402
+
 
 @pytest.fixture(scope="module", autouse=True)
 def use_tifffile_v3():
@@ -474,3 +476,140 @@ def test_iter_pages(tmp_path):
     with iio.imopen(filename, "r") as file:
         for idx, page in enumerate(file.iter_pages(index=1)):
             np.testing.assert_allclose(page, volumetric[idx])
+
+
+@pytest.mark.parametrize(
+    "layout",
+    [
+        {},
+        {"rowsperstrip": 7},
+        {"tile": (32, 64)},
+        {"tile": (32, 64), "compression": "zlib"},
+        {"rowsperstrip": 16, "compression": "zlib", "predictor": True},
+        {"rowsperstrip": 16, "planarconfig": "separate"},
+        {"tile": (64, 32), "compression": "zlib", "planarconfig": "separate"},
+    ],
+)
+def test_read_region(tmp_path, layout):
+    filename = tmp_path / "test.tiff"
+    data = np.random.default_rng(0).integers(0, 2**16, (150, 97, 3), np.uint16)
+    if layout.get("planarconfig") == "separate":
+        data = np.moveaxis(data, -1, 0)
+    tifffile.imwrite(filename, data, photometric="rgb", **layout)
+
+    for rows, cols in [
+        (slice(10, 100), slice(5, 90)),
+        (slice(None), slice(None)),
+        (slice(-3, None), slice(80, 81)),
+        (slice(17, 93, 3), slice(2, None, 7)),
+        (slice(5, 5), slice(0, 10)),
+    ]:
+        actual = iio.imread(filename, region=(rows, cols))
+        expected = data[..., rows, cols] if data.shape[0] == 3 else data[rows, cols]
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_read_region_volume(tmp_path):
+    filename = tmp_path / "test.tiff"
+    data = np.random.default_rng(0).random((20, 64, 48)).astype(np.float32)
+
+    # stack of pages
+    tifffile.imwrite(filename, data, tile=(16, 16))
+    actual = iio.imread(filename, region=(slice(3, 15, 2), slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[3:15:2, 5:30, 1:40])
+
+    actual = iio.imread(filename, region=(slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[:, 5:30, 1:40])
+
+    actual = iio.imread(filename, page=4, region=(slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[4, 5:30, 1:40])
+
+    # volumetric tiles
+    tifffile.imwrite(filename, data, tile=(8, 16, 16), volumetric=True)
+    actual = iio.imread(filename, region=(slice(3, 15), slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[3:15, 5:30, 1:40])
+
+    # batch of series
+    tifffile.imwrite(filename, data[0])
+    tifffile.imwrite(filename, data[1], append=True)
+    actual = iio.imread(filename, index=..., region=(slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[:2, 5:30, 1:40])
+
+    with pytest.raises(ValueError):
+        iio.imread(filename, region=(slice(5, 30),))
+
+    with pytest.raises(ValueError):
+        iio.imread(filename, region=(slice(30, 5, -1), slice(1, 40)))
+
+    with pytest.raises(ValueError):
+        iio.imread(filename, region=(slice(5, 30), slice(1, 40)), maxworkers=2)
+
+
+def test_read_region_fallback(tmp_path, monkeypatch):
+    # without tifffile's segment API, the full page is decoded and cropped
+    filename = tmp_path / "test.tiff"
+    data = np.random.default_rng(0).integers(0, 255, (64, 48), np.uint8)
+    tifffile.imwrite(filename, data, tile=(16, 16), compression="zlib")
+
+    monkeypatch.setattr(tifffile_v3, "_HAS_SEGMENT_API", False)
+    actual = iio.imread(filename, region=(slice(5, 30), slice(1, 40)))
+    np.testing.assert_array_equal(actual, data[5:30, 1:40])
+
+
+def test_read_region_decode_error(tmp_path, monkeypatch):
+    # errors while decoding a segment are not hidden by the fallback
+    filename = tmp_path / "test.tiff"
+    data = np.random.default_rng(0).integers(0, 255, (64, 48), np.uint8)
+    tifffile.imwrite(filename, data, tile=(16, 16), compression="zlib")
+
+    def decode(self):
+        def broken(data, index, **kwargs):
+            raise TypeError("broken decode")
+
+        return broken
+
+    monkeypatch.setattr(tifffile.TiffPage, "decode", property(decode))
+    with pytest.raises(TypeError, match="broken decode"):
+        iio.imread(filename, region=(slice(5, 30), slice(1, 40)))
+
+
+def test_read_memmap(tmp_path):
+    filename = tmp_path / "test.tiff"
+    data = np.arange(4 * 30 * 20 * 3, dtype=np.uint16).reshape(4, 30, 20, 3)
+    iio.imwrite(filename, data)
+
+    img = iio.imread(filename, memmap=True)
+    assert isinstance(img, np.memmap)
+    assert not img.flags.writeable
+    np.testing.assert_array_equal(img, data)
+
+    img = iio.imread(filename, page=2, memmap=True)
+    assert isinstance(img, np.memmap)
+    np.testing.assert_array_equal(img, data[2])
+
+    # can't be mapped; fall back to a normal read
+    img = iio.imread(filename.read_bytes(), extension=".tiff", memmap=True)
+    assert not isinstance(img, np.memmap)
+    np.testing.assert_array_equal(img, data)
+
+    iio.imwrite(filename, data, compression="zlib")
+    img = iio.imread(filename, memmap=True)
+    assert not isinstance(img, np.memmap)
+    np.testing.assert_array_equal(img, data)
+
+    with pytest.raises(ValueError):
+        iio.imread(filename, memmap=True, region=(slice(5), slice(5)))
+
+
+def test_channel_first_layout(tmp_path):
+    filename = tmp_path / "test.tiff"
+    volume = np.zeros((5, 32, 40), dtype=np.uint8)
+    iio.imwrite(filename, volume)
+
+    # the last axis is spatial, not a channel axis
+    with pytest.raises(ValueError):
+        iio.imread(filename, layout="CHW")
+
+    rgb = np.zeros((5, 32, 40, 3), dtype=np.uint8)
+    iio.imwrite(filename, rgb)
+    assert iio.imread(filename, layout="CHW").shape == (5, 3, 32, 40)